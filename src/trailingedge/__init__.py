@@ -1,3 +1,8 @@
 """Trailing Edge Trading Bot - A dynamic trailing stop-loss trading system for Binance."""
 
+from dotenv import load_dotenv
+
+# Load .env once for the whole package; submodules read os.environ at import time
+load_dotenv()
+
 __version__ = "0.1.0"
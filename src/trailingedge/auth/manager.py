@@ -6,25 +6,27 @@ for Binance WebSocket API authentication.
 """
 
 import base64
-import json
+import functools
 import os
 import time
+from typing import TYPE_CHECKING
 
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
-from dotenv import load_dotenv
+import orjson
 
-# Load environment variables from project root
-load_dotenv()
+if TYPE_CHECKING:
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 
 API_KEY = os.getenv("BINANCE_ED25519_API_KEY")
 PRIV_KEY_PATH = os.getenv("BINANCE_ED25519_PRIV_PATH")
 
 
-def load_ed25519_private_key() -> Ed25519PrivateKey:
+def load_ed25519_private_key() -> "Ed25519PrivateKey":
     """
     Load Ed25519 private key from PEM file defined in .env.
     """
+    # Deferred until the first logon to keep import time down
+    from cryptography.hazmat.primitives import serialization
+
     if not PRIV_KEY_PATH:
         raise ValueError("BINANCE_ED25519_PRIV_PATH not set in .env")
     with open(PRIV_KEY_PATH, "rb") as f:
@@ -32,12 +34,22 @@ def load_ed25519_private_key() -> Ed25519PrivateKey:
     return serialization.load_pem_private_key(key_data, password=None)
 
 
-def sign_ed25519_message(message: str) -> str:
+@functools.lru_cache(maxsize=1)
+def _get_private_key() -> "Ed25519PrivateKey":
+    """
+    Return the parsed private key, reading and decoding the PEM only on first use.
+    """
+    return load_ed25519_private_key()
+
+
+def sign_ed25519_message(message: str | bytes) -> str:
     """
     Sign a message with Ed25519 and return a base64-encoded signature.
+    Accepts the message as str (UTF-8 encoded here) or pre-encoded bytes.
     """
-    private_key: Ed25519PrivateKey = load_ed25519_private_key()
-    signature = private_key.sign(message.encode("utf-8"))
+    if isinstance(message, str):
+        message = message.encode("utf-8")
+    signature = _get_private_key().sign(message)
     return base64.b64encode(signature).decode("utf-8")
 
 
@@ -45,15 +57,17 @@ def get_server_timestamp() -> int:
     """
     Return current UNIX timestamp in milliseconds.
     """
-    return int(time.time() * 1000)
+    return time.time_ns() // 1_000_000
 
 
 def build_session_logon_request() -> dict:
     """
     Construct a session.logon request dictionary for Binance WebSocket authentication.
     """
+    if not API_KEY:
+        raise ValueError("BINANCE_ED25519_API_KEY not set in .env")
     ts = get_server_timestamp()
-    payload = f"apiKey={API_KEY}&timestamp={ts}"
+    payload = b"apiKey=%s&timestamp=%d" % (API_KEY.encode(), ts)
     signature = sign_ed25519_message(payload)
     return {
         "id": "session_logon",
@@ -68,6 +82,7 @@ async def send_session_logon(ws) -> dict:
     Returns the parsed response as a dictionary.
     """
     request = build_session_logon_request()
-    await ws.send(json.dumps(request))
+    # Binance expects text frames, so send the encoded JSON as str
+    await ws.send(orjson.dumps(request), text=True)
     response = await ws.recv()
-    return json.loads(response)
+    return orjson.loads(response)
@@ -55,4 +55,5 @@ DONCHIAN_GAIN_MULTIPLIER = 0.5  # Enable Donchian gating (was 0.0)
 # before allowing re-entry. Prevents catching falling knives.
 
 # --- Async Loop Config ---
-LOOP_SLEEP_SEC = 1.0  # Main async loop sleep duration (in seconds)
+LOOP_SLEEP_SEC = 1.0  # Max idle between loop ticks without market updates (seconds)
+PRINT_DIAGNOSTICS = True  # Print the per-tick state block (set False for headless runs)
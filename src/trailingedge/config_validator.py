@@ -10,6 +10,27 @@ from pathlib import Path
 
 from trailingedge import config
 
+# Binance kline intervals, in display order for error messages
+_KLINE_INTERVALS = (
+    "1s",
+    "1m",
+    "3m",
+    "5m",
+    "15m",
+    "30m",
+    "1h",
+    "2h",
+    "4h",
+    "6h",
+    "8h",
+    "12h",
+    "1d",
+    "3d",
+    "1w",
+    "1M",
+)
+_VALID_KLINE_INTERVALS = frozenset(_KLINE_INTERVALS)
+
 
 class ConfigValidationError(Exception):
     """Raised when configuration validation fails."""
@@ -132,27 +153,9 @@ def validate_kline_config():
     """Validate kline configuration."""
     errors = []
 
-    valid_intervals = [
-        "1s",
-        "1m",
-        "3m",
-        "5m",
-        "15m",
-        "30m",
-        "1h",
-        "2h",
-        "4h",
-        "6h",
-        "8h",
-        "12h",
-        "1d",
-        "3d",
-        "1w",
-        "1M",
-    ]
-    if config.KLINE_INTERVAL not in valid_intervals:
+    if config.KLINE_INTERVAL not in _VALID_KLINE_INTERVALS:
         errors.append(
-            f"KLINE_INTERVAL must be one of {valid_intervals}, got {config.KLINE_INTERVAL}"
+            f"KLINE_INTERVAL must be one of {list(_KLINE_INTERVALS)}, got {config.KLINE_INTERVAL}"
         )
 
     if config.ROLLING_KLINES_MAXLEN <= 0:
@@ -168,11 +171,7 @@ def validate_kline_config():
 
 def validate_environment_variables():
     """Validate that required environment variables are set."""
-    from dotenv import load_dotenv
-
-    # Load .env file
-    load_dotenv()
-
+    # .env is loaded once when the trailingedge package is imported
     errors = []
     required_vars = [
         "BINANCE_ED25519_API_KEY",
@@ -194,10 +193,6 @@ def validate_environment_variables():
 
 def validate_secrets_files():
     """Validate that required secrets files exist and are readable."""
-    from dotenv import load_dotenv
-
-    load_dotenv()
-
     errors = []
     priv_key_path = os.getenv("BINANCE_ED25519_PRIV_PATH")
 
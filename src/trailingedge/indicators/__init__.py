@@ -1,6 +1,7 @@
 """Technical Indicators for Trading Bot"""
 
 from trailingedge.indicators.atr import (
+    ATRState,
     compute_atr,
     compute_atr_from_kline_dicts,
     compute_atr_from_rows,
@@ -9,9 +10,13 @@ from trailingedge.indicators.atr import (
     rolling_median,
     rolling_percentile,
 )
-from trailingedge.indicators.donchian import compute_donchian_channels
+from trailingedge.indicators.donchian import DonchianState, compute_donchian_channels
+from trailingedge.indicators.kline_buffer import KlineBuffer
 
 __all__ = [
+    "ATRState",
+    "DonchianState",
+    "KlineBuffer",
     "compute_atr",
     "compute_atr_from_kline_dicts",
     "compute_atr_from_rows",
@@ -3,10 +3,94 @@ ATR (Average True Range) Indicator Calculations
 
 Provides multiple ATR calculation methods including Wilder's smoothing, EMA, and SMA.
 Supports both Binance kline stream dicts and historical row formats.
+ATRState provides an incremental variant for streaming klines.
 """
 
+from collections import deque
+
 import numpy as np
-import pandas as pd
+
+try:
+    import bottleneck as bn  # Optional C moving-window kernels, see the "fast" extra
+except ImportError:
+    bn = None
+
+
+def _true_range(highs, lows, closes):
+    """
+    Compute True Range for each bar after the first.
+
+    Args:
+        highs: Sequence of high prices
+        lows: Sequence of low prices
+        closes: Sequence of close prices
+
+    Returns:
+        NumPy array of TR values (length len(closes) - 1)
+    """
+    h = np.asarray(highs, dtype=np.float64)
+    lo = np.asarray(lows, dtype=np.float64)
+    prev_c = np.asarray(closes, dtype=np.float64)[:-1]
+    h, lo = h[1:], lo[1:]
+    return np.maximum(np.maximum(h - lo, np.abs(h - prev_c)), np.abs(lo - prev_c))
+
+
+def _wilder(tr, period):
+    """Wilder's RMA of TR, seeded with the mean of the first 'period' values."""
+    values = tr.tolist()  # Python floats: much cheaper scalar math than np.float64
+    rma_val = sum(values[:period]) / period
+    rma = [rma_val]
+    for val in values[period:]:
+        rma_val = (rma_val * (period - 1) + val) / period
+        rma.append(rma_val)
+    return rma
+
+
+def _ema(tr, period):
+    """EMA of TR, seeded with the mean of the first 'period' values."""
+    values = tr.tolist()
+    k = 2 / (period + 1)
+    ema_val = sum(values[:period]) / period
+    ema = [ema_val]
+    for val in values[period:]:
+        ema_val = val * k + ema_val * (1 - k)
+        ema.append(ema_val)
+    return ema
+
+
+def _sma(tr, period):
+    """Simple moving average of TR over full windows only."""
+    return np.convolve(tr, np.ones(period) / period, mode="valid").tolist()
+
+
+def _parse_dict(klines):
+    """Extract high/low/close float64 arrays from kline stream dicts."""
+    n = len(klines)
+    return (
+        np.fromiter((float(k["h"]) for k in klines), np.float64, n),
+        np.fromiter((float(k["l"]) for k in klines), np.float64, n),
+        np.fromiter((float(k["c"]) for k in klines), np.float64, n),
+    )
+
+
+def _parse_row(klines):
+    """Extract high/low/close float64 arrays from REST/list rows."""
+    n = len(klines)
+    return (
+        np.fromiter((float(r[2]) for r in klines), np.float64, n),
+        np.fromiter((float(r[3]) for r in klines), np.float64, n),
+        np.fromiter((float(r[4]) for r in klines), np.float64, n),
+    )
+
+
+def _parse_soa(klines):
+    """Use the float columns of a KlineBuffer (or similar) directly."""
+    return klines.highs, klines.lows, klines.closes
+
+
+# Resolved once per call by key instead of if/elif chains on strings
+_PARSERS = {"dict": _parse_dict, "row": _parse_row, "soa": _parse_soa}
+_SMOOTHERS = {"wilder": _wilder, "ema": _ema, "sma": _sma, "simple": _sma}
 
 
 def compute_atr_from_rows(klines, period=14, method="wilder"):
@@ -21,41 +105,18 @@ def compute_atr_from_rows(klines, period=14, method="wilder"):
     Returns:
         List of ATR values with None for warmup period
     """
-    closes = [float(row[4]) for row in klines]
-    highs = [float(row[2]) for row in klines]
-    lows = [float(row[3]) for row in klines]
+    highs, lows, closes = _parse_row(klines)
     if len(closes) < period + 1:
         return []
 
-    tr = []
-    for i in range(1, len(closes)):
-        tr_val = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1]),
-        )
-        tr.append(tr_val)
+    tr = _true_range(highs, lows, closes)
 
     if method == "wilder":
-        rma = []
-        rma_val = np.mean(tr[:period])
-        rma.append(rma_val)
-        for val in tr[period:]:
-            rma_val = (rma_val * (period - 1) + val) / period
-            rma.append(rma_val)
-        atr_series = [None] * (period) + rma
+        atr_series = [None] * (period) + _wilder(tr, period)
     elif method == "ema":
-        ema = []
-        k = 2 / (period + 1)
-        ema_val = np.mean(tr[:period])
-        ema.append(ema_val)
-        for val in tr[period:]:
-            ema_val = val * k + ema_val * (1 - k)
-            ema.append(ema_val)
-        atr_series = [None] * (period) + ema
+        atr_series = [None] * (period) + _ema(tr, period)
     elif method == "sma":
-        sma = [np.mean(tr[i - period + 1 : i + 1]) for i in range(period - 1, len(tr))]
-        atr_series = [None] * (period - 1) + sma
+        atr_series = [None] * (period - 1) + _sma(tr, period)
     else:
         raise ValueError("ATR method must be 'wilder', 'ema', or 'sma'")
     return atr_series
@@ -72,21 +133,15 @@ def compute_atr_from_kline_dicts(kline_dicts, period=60):
     Returns:
         NumPy array of ATR values
     """
-    closes = np.array([float(k["c"]) for k in kline_dicts])
-    highs = np.array([float(k["h"]) for k in kline_dicts])
-    lows = np.array([float(k["l"]) for k in kline_dicts])
-    atr_list = []
-    for i in range(period, len(kline_dicts)):
-        tr = []
-        for j in range(i - period + 1, i + 1):
-            high = highs[j]
-            low = lows[j]
-            prev_close = closes[j - 1] if j > 0 else closes[0]
-            tr_val = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            tr.append(tr_val)
-        atr = sum(tr) / period
-        atr_list.append(atr)
-    return np.array(atr_list)
+    if len(kline_dicts) < period + 1:
+        return np.array([])
+    closes = [float(k["c"]) for k in kline_dicts]
+    highs = [float(k["h"]) for k in kline_dicts]
+    lows = [float(k["l"]) for k in kline_dicts]
+    tr = _true_range(highs, lows, closes)
+    # Rolling mean of TR over 'period' bars via a cumulative sum
+    csum = np.concatenate(([0.0], np.cumsum(tr)))
+    return (csum[period:] - csum[:-period]) / period
 
 
 def compute_atr_from_window(klines, period=60):
@@ -133,67 +188,33 @@ def compute_atr(
     Supports Binance kline dicts or historical rows.
 
     Args:
-        klines: List of klines (dicts or rows)
+        klines: List of klines (dicts or rows), or a KlineBuffer
         period: ATR period (default 14)
         method: 'wilder', 'ema', or 'sma'/'simple'
-        row_format: 'dict' (kline stream dicts) or 'row' (REST/list rows)
+        row_format: 'dict' (kline stream dicts), 'row' (REST/list rows) or
+                    'soa' (KlineBuffer or other object with highs/lows/closes)
         return_series: If True, returns full series; if False, returns last value
 
     Returns:
         List of ATR values (if return_series=True) or single float/None
     """
     # Parse prices
-    if row_format == "dict":
-        highs = [float(k["h"]) for k in klines]
-        lows = [float(k["l"]) for k in klines]
-        closes = [float(k["c"]) for k in klines]
-    elif row_format == "row":
-        highs = [float(r[2]) for r in klines]
-        lows = [float(r[3]) for r in klines]
-        closes = [float(r[4]) for r in klines]
-    else:
-        raise ValueError("row_format must be 'dict' or 'row'")
+    parse = _PARSERS.get(row_format)
+    if parse is None:
+        raise ValueError("row_format must be 'dict', 'row' or 'soa'")
+    highs, lows, closes = parse(klines)
 
     if len(closes) < period + 1:
         return None if not return_series else [None] * len(closes)
 
-    # Calculate True Range (TR)
-    tr = []
-    for i in range(1, len(closes)):
-        tr_val = max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i - 1]),
-            abs(lows[i] - closes[i - 1]),
-        )
-        tr.append(tr_val)
-
-    if method == "wilder":
-        # Wilder's RMA (smoothed moving average)
-        rma = []
-        rma_val = np.mean(tr[:period])
-        rma += [None] * period  # To align with kline length
-        rma.append(rma_val)
-        for val in tr[period:]:
-            rma_val = (rma_val * (period - 1) + val) / period
-            rma.append(rma_val)
-        atr_series = rma
-    elif method == "ema":
-        ema = []
-        k = 2 / (period + 1)
-        ema_val = np.mean(tr[:period])
-        ema += [None] * period
-        ema.append(ema_val)
-        for val in tr[period:]:
-            ema_val = val * k + ema_val * (1 - k)
-            ema.append(ema_val)
-        atr_series = ema
-    elif method in ("sma", "simple"):
-        sma = [None] * period
-        sma += [np.mean(tr[i - period + 1 : i + 1]) for i in range(period - 1, len(tr))]
-        atr_series = sma
-    else:
+    smooth = _SMOOTHERS.get(method)
+    if smooth is None:
         raise ValueError("method must be 'wilder', 'ema', or 'sma'/'simple'")
 
+    # Calculate True Range (TR), then pad with None to align with kline length
+    tr = _true_range(highs, lows, closes)
+    atr_series = [None] * period + smooth(tr, period)
+
     # Return series or just last valid ATR
     if return_series:
         return atr_series
@@ -204,21 +225,135 @@ def compute_atr(
         return None
 
 
+class ATRState:
+    """
+    Incremental ATR over streaming klines.
+
+    Keeps the previous close and the current smoothed value, so each new bar is
+    a single recurrence step instead of recomputing the whole series. The value
+    after each update matches compute_atr(..., return_series=False) over the
+    same bars.
+    """
+
+    def __init__(self, period=14, method="wilder", klines=None, row_format="dict"):
+        """
+        Args:
+            period: ATR period (default 14)
+            method: 'wilder', 'ema', or 'sma'/'simple'
+            klines: Optional historical klines to warm up the state
+            row_format: 'dict' (kline stream dicts), 'row' (REST/list rows or a
+                2D array) or 'soa' (KlineBuffer columns)
+        """
+        if method not in ("wilder", "ema", "sma", "simple"):
+            raise ValueError("method must be 'wilder', 'ema', or 'sma'/'simple'")
+        self.period = period
+        self.method = method
+        self.value = None  # Current ATR, None until 'period' TRs have been seen
+        self.prev_close = None
+        self._seed = []  # TRs collected before the first Wilder/EMA value
+        self._window = deque(maxlen=period)  # SMA window of TRs
+        self._window_sum = 0.0
+        self._k = 2 / (period + 1)
+
+        # len() rather than truthiness: numpy arrays have no single truth value
+        if klines is not None and len(klines):
+            if row_format == "dict":
+                for k in klines:
+                    self.update(k["h"], k["l"], k["c"])
+            elif row_format == "row":
+                for r in klines:
+                    self.update(r[2], r[3], r[4])
+            elif row_format == "soa":
+                for high, low, close in zip(
+                    klines.highs.tolist(),
+                    klines.lows.tolist(),
+                    klines.closes.tolist(),
+                    strict=True,
+                ):
+                    self.update(high, low, close)
+            else:
+                raise ValueError("row_format must be 'dict', 'row' or 'soa'")
+
+    def update(self, high, low, close):
+        """
+        Add a new bar.
+
+        Returns:
+            Current ATR value, or None if insufficient data
+        """
+        high, low, close = float(high), float(low), float(close)
+        prev_close = self.prev_close
+        self.prev_close = close
+        if prev_close is None:
+            return None
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        if self.method in ("sma", "simple"):
+            if len(self._window) == self.period:
+                self._window_sum -= self._window[0]
+            self._window.append(tr)
+            self._window_sum += tr
+            if len(self._window) == self.period:
+                self.value = self._window_sum / self.period
+        elif self.value is None:
+            self._seed.append(tr)
+            if len(self._seed) == self.period:
+                self.value = sum(self._seed) / self.period
+                self._seed = []
+        elif self.method == "wilder":
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+        else:
+            self.value = tr * self._k + self.value * (1 - self._k)
+        return self.value
+
+
 def rolling_median(arr, window):
-    """Compute rolling median with pandas."""
+    """
+    Compute rolling median (min_periods=1, NaNs skipped).
+    Uses bottleneck's move_median when installed, otherwise pandas.
+    """
+    if bn is not None:
+        values = np.asarray(arr, dtype=np.float64)
+        if len(values) == 0:
+            return values
+        # A window longer than the data covers the same bars as one of len(data)
+        return bn.move_median(values, min(window, len(values)), min_count=1)
+
+    import pandas as pd  # Deferred: only charting needs pandas
+
     return pd.Series(arr).rolling(window, min_periods=1).median().to_numpy()
 
 
 def rolling_mean(arr, window):
-    """Compute rolling mean with pandas."""
-    return pd.Series(arr).rolling(window, min_periods=1).mean().to_numpy()
+    """
+    Compute rolling mean with cumulative sums (min_periods=1, NaNs skipped).
+    Matches pandas rolling(window, min_periods=1).mean() without the per-call
+    Series/Rolling construction.
+    """
+    values = np.asarray(arr, dtype=np.float64)
+    valid = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    n = counts[end] - counts[start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (sums[end] - sums[start]) / n
+    out[n == 0] = np.nan
+    return out
 
 
 def rolling_percentile(arr, window, percentile=80):
-    """Compute rolling percentile with pandas."""
-    return (
-        pd.Series(arr)
-        .rolling(window, min_periods=1)
-        .apply(lambda x: np.percentile(x, percentile))
-        .to_numpy()
-    )
+    """
+    Compute rolling percentile over sliding windows (min_periods=1).
+    Full windows are evaluated in one vectorized np.percentile call; only the
+    first window-1 (partial) windows are computed individually.
+    """
+    values = np.asarray(arr, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    for i in range(min(window - 1, len(values))):
+        out[i] = np.percentile(values[: i + 1], percentile)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        out[window - 1 :] = np.percentile(windows, percentile, axis=1)
+    return out
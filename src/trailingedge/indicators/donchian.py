@@ -3,10 +3,43 @@ Donchian Channel Indicator Calculations
 
 Computes Donchian Channels (upper, lower, mid) using rolling windows.
 Supports both Binance kline stream dicts and historical row formats.
+DonchianState provides an incremental variant for streaming klines.
 """
 
+from collections import deque
+
 import numpy as np
-import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _rolling_extrema(values, window):
+    """
+    Rolling max/min over 'window' values with min_periods=1 semantics
+    (the first window-1 entries cover the partial window seen so far).
+    """
+    n = len(values)
+    upper = np.empty(n)
+    lower = np.empty(n)
+    ramp = min(window - 1, n)
+    upper[:ramp] = np.maximum.accumulate(values[:ramp])
+    lower[:ramp] = np.minimum.accumulate(values[:ramp])
+    if n >= window:
+        windows = sliding_window_view(values, window)
+        upper[window - 1 :] = windows.max(axis=1)
+        lower[window - 1 :] = windows.min(axis=1)
+    return upper, lower
+
+
+def _shift(values, shift):
+    """Shift an array by 'shift' positions, filling vacated slots with NaN."""
+    if shift == 0:
+        return values
+    out = np.full(len(values), np.nan)
+    if shift > 0:
+        out[shift:] = values[:-shift]
+    else:
+        out[:shift] = values[-shift:]
+    return out
 
 
 def compute_donchian_channels(
@@ -20,27 +53,116 @@ def compute_donchian_channels(
     with a rolling window and configurable shift.
 
     Args:
-        klines: List of klines (dicts or rows)
+        klines: List of klines (dicts or rows), or a KlineBuffer
         window: Rolling window size (default 20)
         shift: Number of periods to shift back (default 1)
         row_format: 'dict' for kline stream dicts (field 'c'),
-                    'row' for REST/list rows ([4] is close)
+                    'row' for REST/list rows ([4] is close),
+                    'soa' for a KlineBuffer (or any object with .closes)
 
     Returns:
         Tuple of (upper, lower, mid) as NumPy arrays
     """
     if row_format == "dict":
-        closes = np.array([float(k["c"]) for k in klines])
+        closes = np.fromiter((float(k["c"]) for k in klines), np.float64, len(klines))
     elif row_format == "row":
-        closes = np.array([float(r[4]) for r in klines])
+        closes = np.fromiter((float(r[4]) for r in klines), np.float64, len(klines))
+    elif row_format == "soa":
+        closes = np.asarray(klines.closes, dtype=np.float64)
     else:
-        raise ValueError("row_format must be 'dict' or 'row'")
-
-    upper = (
-        pd.Series(closes).rolling(window, min_periods=1).max().shift(shift).to_numpy()
-    )
-    lower = (
-        pd.Series(closes).rolling(window, min_periods=1).min().shift(shift).to_numpy()
-    )
+        raise ValueError("row_format must be 'dict', 'row' or 'soa'")
+
+    upper, lower = _rolling_extrema(closes, window)
+    upper = _shift(upper, shift)
+    lower = _shift(lower, shift)
     mid = (upper + lower) / 2
     return upper, lower, mid
+
+
+class DonchianState:
+    """
+    Incremental Donchian Channel over streaming closes.
+
+    Keeps monotonic deques of (index, close) for the rolling max and min, so
+    each new bar costs O(1) amortized instead of rescanning the whole window.
+    The last value returned matches compute_donchian_channels(...)[-1] for the
+    same closes, window and shift.
+    """
+
+    def __init__(self, window=20, shift=1, closes=()):
+        """
+        Args:
+            window: Rolling window size (default 20)
+            shift: Number of periods to shift back (default 1)
+            closes: Optional historical closes to warm up the state
+        """
+        self.window = window
+        self.shift = shift
+        self._tail = deque(maxlen=window + shift)  # Recent closes, incl. shifted-out
+        self._max = deque()  # (index, close), closes strictly decreasing
+        self._min = deque()  # (index, close), closes strictly increasing
+        self._count = 0
+        for close in closes:
+            self.update(close)
+
+    def _push(self, idx, value):
+        """Add bar 'idx' to the window and evict bars that fell out of it."""
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((idx, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((idx, value))
+        cutoff = idx - self.window
+        while self._max[0][0] <= cutoff:
+            self._max.popleft()
+        while self._min[0][0] <= cutoff:
+            self._min.popleft()
+
+    def _rebuild(self):
+        """Rebuild both deques from the retained closes."""
+        self._max.clear()
+        self._min.clear()
+        last = self._count - 1 - self.shift
+        first_in_tail = self._count - len(self._tail)
+        for idx in range(max(0, last - self.window + 1), last + 1):
+            self._push(idx, self._tail[idx - first_in_tail])
+
+    def update(self, close):
+        """
+        Append a new bar's close.
+
+        Returns:
+            Tuple of (upper, lower, mid) floats (NaN until a bar is in the window)
+        """
+        self._tail.append(float(close))
+        self._count += 1
+        entered = self._count - 1 - self.shift
+        if entered >= 0:
+            self._push(entered, self._tail[-1 - self.shift])
+        return self.channels()
+
+    def amend(self, close):
+        """
+        Revise the close of the newest (still forming) bar.
+
+        With shift >= 1 the newest bar is not yet inside the window, so this is
+        O(1); with shift == 0 the deques are rebuilt from the retained closes.
+
+        Returns:
+            Tuple of (upper, lower, mid) floats
+        """
+        if not self._count:
+            return self.update(close)
+        self._tail[-1] = float(close)
+        if self.shift == 0:
+            self._rebuild()
+        return self.channels()
+
+    def channels(self):
+        """Return the current (upper, lower, mid) as floats."""
+        if not self._max:
+            return float("nan"), float("nan"), float("nan")
+        upper = self._max[0][1]
+        lower = self._min[0][1]
+        return upper, lower, (upper + lower) / 2
@@ -0,0 +1,174 @@
+"""
+Rolling Kline Buffer (Struct-of-Arrays)
+
+Stores a rolling window of klines as parallel NumPy arrays so indicator code
+can read contiguous float64 columns instead of parsing dict fields per call.
+"""
+
+import numpy as np
+
+
+class KlineBuffer:
+    """
+    Fixed-length rolling window of klines stored column-wise.
+
+    Each column is backed by an array of twice the window length. Appends write
+    past the current end; once the backing array is full, the live window is
+    copied back to the front. Column views are therefore always contiguous and
+    in time order, and appends are amortized O(1).
+
+    Column properties return views into the buffer: they reflect later
+    update_last() calls and are invalidated by the next append().
+    """
+
+    def __init__(self, maxlen):
+        """
+        Args:
+            maxlen: Maximum number of klines kept in the window
+        """
+        if maxlen < 1:
+            raise ValueError("maxlen must be >= 1")
+        self.maxlen = maxlen
+        capacity = 2 * maxlen
+        self._open_times = np.zeros(capacity, dtype=np.int64)
+        self._close_times = np.zeros(capacity, dtype=np.int64)
+        self._opens = np.zeros(capacity, dtype=np.float64)
+        self._highs = np.zeros(capacity, dtype=np.float64)
+        self._lows = np.zeros(capacity, dtype=np.float64)
+        self._closes = np.zeros(capacity, dtype=np.float64)
+        self._volumes = np.zeros(capacity, dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    @classmethod
+    def from_rows(cls, rows, maxlen=None):
+        """
+        Build a buffer from historical kline rows in one column-wise pass.
+
+        Parse the rows once this way and hand the buffer to every indicator
+        (row_format='soa') instead of letting each one re-parse the strings.
+
+        Args:
+            rows: Binance REST kline rows ([open_time, o, h, l, c, v, close_time, ...])
+            maxlen: Window length (default: len(rows), at least 1)
+
+        Returns:
+            KlineBuffer holding the newest maxlen rows
+        """
+        buf = cls(maxlen if maxlen is not None else max(len(rows), 1))
+        buf.extend_rows(rows)
+        return buf
+
+    def __len__(self):
+        return self._end - self._start
+
+    def _columns(self):
+        return (
+            self._open_times,
+            self._close_times,
+            self._opens,
+            self._highs,
+            self._lows,
+            self._closes,
+            self._volumes,
+        )
+
+    def _write(self, i, kline):
+        """Write a Binance kline stream dict (string or float prices) into slot i."""
+        self._open_times[i] = kline["t"]
+        self._close_times[i] = kline["T"]
+        self._opens[i] = float(kline["o"])
+        self._highs[i] = float(kline["h"])
+        self._lows[i] = float(kline["l"])
+        self._closes[i] = float(kline["c"])
+        self._volumes[i] = float(kline["v"])
+
+    def append(self, kline):
+        """
+        Append a new kline, dropping the oldest one once the window is full.
+
+        Args:
+            kline: Binance kline stream dict (fields t, T, o, h, l, c, v)
+        """
+        if self._end == len(self._closes):
+            n = len(self)
+            for col in self._columns():
+                col[:n] = col[self._start : self._end]
+            self._start, self._end = 0, n
+        self._write(self._end, kline)
+        self._end += 1
+        if self._end - self._start > self.maxlen:
+            self._start += 1
+
+    def extend_rows(self, rows):
+        """
+        Bulk-append historical kline rows, keeping the newest maxlen klines.
+
+        Rows are converted column-wise in one pass instead of being built into
+        stream dicts first.
+
+        Args:
+            rows: Binance REST kline rows ([open_time, o, h, l, c, v, close_time, ...])
+        """
+        if not len(rows):
+            return
+        arr = np.asarray(rows, dtype=object)[-self.maxlen :]
+        n = len(arr)
+        keep = min(len(self), self.maxlen - n)
+        for col in self._columns():
+            col[:keep] = col[self._end - keep : self._end]
+        end = keep + n
+        self._open_times[keep:end] = arr[:, 0].astype(np.int64)
+        self._close_times[keep:end] = arr[:, 6].astype(np.int64)
+        self._opens[keep:end] = arr[:, 1].astype(np.float64)
+        self._highs[keep:end] = arr[:, 2].astype(np.float64)
+        self._lows[keep:end] = arr[:, 3].astype(np.float64)
+        self._closes[keep:end] = arr[:, 4].astype(np.float64)
+        self._volumes[keep:end] = arr[:, 5].astype(np.float64)
+        self._start, self._end = 0, end
+
+    def update_last(self, kline):
+        """
+        Overwrite the newest kline in place (e.g. the still-forming candle).
+
+        Args:
+            kline: Binance kline stream dict (fields t, T, o, h, l, c, v)
+        """
+        if not len(self):
+            raise IndexError("update_last on empty KlineBuffer")
+        self._write(self._end - 1, kline)
+
+    @property
+    def last_close_time(self):
+        """Close time (ms) of the newest kline, or None if empty."""
+        if not len(self):
+            return None
+        return int(self._close_times[self._end - 1])
+
+    @property
+    def open_times(self):
+        return self._open_times[self._start : self._end]
+
+    @property
+    def close_times(self):
+        return self._close_times[self._start : self._end]
+
+    @property
+    def opens(self):
+        return self._opens[self._start : self._end]
+
+    @property
+    def highs(self):
+        return self._highs[self._start : self._end]
+
+    @property
+    def lows(self):
+        return self._lows[self._start : self._end]
+
+    @property
+    def closes(self):
+        return self._closes[self._start : self._end]
+
+    @property
+    def volumes(self):
+        return self._volumes[self._start : self._end]
@@ -4,9 +4,13 @@ Logging Configuration for Trailing Edge Trading Bot
 Provides hybrid logging with console output (INFO) and file rotation (DEBUG).
 Keeps print() statements for real-time monitoring while logging critical events.
 Creates timestamped log files for each session.
+File writes happen on a background QueueListener thread, off the trading loop.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 from pathlib import Path
 
@@ -56,14 +60,27 @@ def setup_logging(
     session_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     log_file = Path(log_dir) / f"trailingedge_{session_timestamp}.log"
 
-    # File handler with session timestamp (DEBUG level for everything)
+    # File handler with session timestamp (DEBUG level for everything).
+    # Records are queued by the logging call and written by a listener thread,
+    # so the event loop never blocks on file I/O.
     file_handler = logging.FileHandler(
         str(log_file),
         encoding="utf-8",
+        delay=True,
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(logging.DEBUG)
+    logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)  # Drain queued records on shutdown
 
     # Create a 'latest.log' symlink/copy for easy access
     latest_log = Path(log_dir) / "latest.log"
@@ -1,13 +1,21 @@
 """Trailing Edge Trading Bot - Main Entry Point"""
 
 import asyncio
+import contextlib
 import math
+import os
 import sys
 import threading
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 
 import websockets
 
+try:
+    import uvloop  # Optional libuv event loop (POSIX only), see the "fast" extra
+except ImportError:
+    uvloop = None
+
 from trailingedge.auth.manager import send_session_logon
 
 # Load configuration
@@ -30,16 +38,23 @@ from trailingedge.config import (
     MIN_NOTIONAL,
     MIN_QTY,
     PRICE_TICK,
+    PRINT_DIAGNOSTICS,
     QUOTE_ASSET,
     ROLLING_KLINES_MAXLEN,
     START_FACTOR,
     SYMBOL,
 )
-from trailingedge.indicators.donchian import compute_donchian_channels
+from trailingedge.indicators.donchian import DonchianState
+from trailingedge.indicators.kline_buffer import KlineBuffer
 from trailingedge.logging_config import get_logger, setup_logging
-from trailingedge.notifications.telegram import broadcast_telegram_message
+from trailingedge.notifications.telegram import (
+    enqueue_telegram_message,
+    flush_telegram_queue,
+    telegram_worker,
+)
 from trailingedge.websocket.account import subscribe_user_stream
 from trailingedge.websocket.account_stream import (
+    Balances,
     account_ws_receiver,
     get_balance_from_snapshot,
 )
@@ -56,31 +71,44 @@ from trailingedge.websocket.orders import (
 # Bot identification
 BOT_MARK = "Trailing Edge Bot v1.0"
 
+# Same object setup_logging() configures; resolved once rather than per log call
+logger = get_logger()
+
+# Min-gain constants, resolved once instead of on every loop tick
+_FEE_PLUS_BUFFER = FEE + BUFFER
+
+# Regime markers for Telegram alerts
+_REGIME_EMOJI = {"BASE": "🟥", "QUOTE": "🟩"}
+
+# Per-regime (value_unit, gain_scale_frac, min_gain_trigger_frac)
+_REGIME_PARAMS = {
+    "BASE": (QUOTE_ASSET, GAIN_SCALE_FRAC_BASE, MIN_GAIN_TRIGGER_FRAC_BASE),
+    "QUOTE": (BASE_ASSET, GAIN_SCALE_FRAC_QUOTE, MIN_GAIN_TRIGGER_FRAC_QUOTE),
+}
+
 
 # --- State ---
+@dataclass(slots=True)
 class TrailingState:
-    def __init__(self):
-        # Inventory states
-        self.live_bal_free = {BASE_ASSET: 0.0, QUOTE_ASSET: 0.0}
-        self.live_bal_locked = {BASE_ASSET: 0.0, QUOTE_ASSET: 0.0}
-        self.live_bal_total = {BASE_ASSET: 0.0, QUOTE_ASSET: 0.0}
-
-        # Anchor/highs/regime states
-        self.anchor_value = None
-        self.high_value = None
-        self.current_regime = None
-        self.prev_regime = None
-
-        # Order fill flags
-        self.maker_exit_armed = False
-        self.hard_stop_armed = False
+    # Inventory states
+    bal: Balances = field(default_factory=Balances)
+
+    # Anchor/highs/regime states
+    anchor_value: float | None = None
+    high_value: float | None = None
+    current_regime: str | None = None
+    prev_regime: str | None = None
 
-        # --- For hard stop and re-entry logic ---
-        self.donchian_gate_active = False
-        self.last_donchian_regime = None  # "BASE" or "QUOTE"
+    # Order fill flags
+    maker_exit_armed: bool = False
+    hard_stop_armed: bool = False
 
-        # --- Hotkey flag
-        self.manual_exit_triggered = False  # <-- hotkey arm flag
+    # --- For hard stop and re-entry logic ---
+    donchian_gate_active: bool = False
+    last_donchian_regime: str | None = None  # "BASE" or "QUOTE"
+
+    # --- Hotkey flag
+    manual_exit_triggered: bool = False  # <-- hotkey arm flag
 
     def reset_for_regime_flip(self, current_value):
         """
@@ -120,6 +148,14 @@ def clip(value: float | None, step: float | None) -> float:
     return (int(value / step)) * step
 
 
+def _fast_clip(value: float, step: float) -> float:
+    """
+    Hot-path variant of clip() for known positive floats and a non-zero step.
+    Skips the None/zero guards; floor() matches int() truncation for value >= 0.
+    """
+    return math.floor(value / step) * step
+
+
 def fmt(value: float | None, precision: int = 8) -> str:
     """
     Format numbers for printing/Telegram/log output (default: 8 decimals).
@@ -133,6 +169,16 @@ def fmt(value: float | None, precision: int = 8) -> str:
         return str(value)  # fallback for non-numeric input
 
 
+def fmt_bal(account_snapshot: dict, asset: str) -> str:
+    """Format one asset's free/locked balances from the raw account snapshot."""
+    snap = account_snapshot.get(asset) or {}
+    return (
+        f"{asset}\n"
+        f"  Free:   {snap.get('free', 0.0):.8f}\n"
+        f"  Locked: {snap.get('locked', 0.0):.8f}"
+    )
+
+
 def fmt_ts(ms: int | None, tz_offset: int = 7) -> str:
     """Converts ms to YYYY-MM-DD HH:MM (UTC+7 default)."""
     if ms is None:
@@ -175,13 +221,6 @@ def normalize_historical_kline_row(row, symbol, interval):
     }
 
 
-def normalize_historical_klines(rows, symbol, interval):
-    """
-    Converts a list of historical kline rows to list of dicts (as Binance WS 'k' format).
-    """
-    return [normalize_historical_kline_row(r, symbol, interval) for r in rows]
-
-
 def debug_print_last_klines(klines, label="Last klines"):
     """
     Debug utility to print last 4 klines with timestamps and close prices.
@@ -230,7 +269,7 @@ def calc_deep_jumpstart_params(bid, ask):
 
 
 def detect_regime(
-    bal: dict[str, float], bid: float, ask: float, debug: bool = False
+    base_total: float, quote_total: float, bid: float, ask: float, debug: bool = False
 ) -> str | None:
     """
     Detect trading regime based on tradable inventory.
@@ -241,7 +280,8 @@ def detect_regime(
     - None: Insufficient funds to trade in either direction
 
     Args:
-        bal: Dictionary with asset balances {BASE_ASSET: float, QUOTE_ASSET: float}
+        base_total: Total base asset balance
+        quote_total: Total quote asset balance
         bid: Current bid price
         ask: Current ask price
         debug: If True, returns (None, reason_str) when regime is None
@@ -259,15 +299,12 @@ def detect_regime(
         - quote_amt >= MIN_NOTIONAL AND
         - quote_amt / ask (clipped to LOT_SIZE) >= MIN_QTY
     """
-    base_amt = float(bal[BASE_ASSET])
-    quote_amt = float(bal[QUOTE_ASSET])
-    can_sell_base = base_amt >= MIN_QTY and (base_amt * bid) >= MIN_NOTIONAL
-    can_buy_base = quote_amt >= MIN_NOTIONAL and (
-        clip(quote_amt / ask, LOT_SIZE) >= MIN_QTY
-    )
-    if can_sell_base:
+    base_amt = base_total
+    quote_amt = quote_total
+    # BASE is checked first and returns before the QUOTE clip/divide is computed
+    if base_amt >= MIN_QTY and (base_amt * bid) >= MIN_NOTIONAL:
         return "BASE"
-    elif can_buy_base:
+    if quote_amt >= MIN_NOTIONAL and _fast_clip(quote_amt / ask, LOT_SIZE) >= MIN_QTY:
         return "QUOTE"
     else:
         if debug:
@@ -278,46 +315,69 @@ def detect_regime(
                 reason.append("Base notional below min")
             if quote_amt < MIN_NOTIONAL:
                 reason.append("Quote asset below min notional")
-            if clip(quote_amt / ask, LOT_SIZE) < MIN_QTY:
+            if _fast_clip(quote_amt / ask, LOT_SIZE) < MIN_QTY:
                 reason.append("Quote to base min qty fail")
             return None, "; ".join(reason)
         return None
 
 
-def value_drop_frac(current_value: float | None, anchor: float | None) -> float:
-    """Calculate fractional drop from anchor value."""
-    if anchor and current_value is not None:
-        return (anchor - current_value) / anchor
-    return 0
+async def _wait_until(ready, updated, timeout):
+    """
+    Wait until ready() is true, re-checking only when a producer sets `updated`.
+    Returns False if the timeout elapses first.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not ready():
+        updated.clear()
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        try:
+            await asyncio.wait_for(updated.wait(), timeout=remaining)
+        except asyncio.TimeoutError:
+            return ready()
+    return True
+
+
+async def wait_for_next_tick(updated, deadline):
+    """
+    Idle until a producer sets `updated` or the loop-clock `deadline` passes,
+    whichever comes first, then clear the event for the next tick.
+    A single bounded wait: a quiet market still ticks once per deadline.
+    """
+    loop = asyncio.get_running_loop()
+    with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(updated.wait(), timeout=max(0.0, deadline - loop.time()))
+    updated.clear()
 
 
 async def wait_for_market_snapshot(
-    snapshot, required_keys, label="", timeout=10.0, poll=0.05
+    snapshot, required_keys, updated, label="", timeout=10.0
 ):
     """
     Wait until all required_keys exist and are non-None in snapshot dict.
     Keys are assumed flat strings, e.g. ["bid_price", "ask_price"].
+    `updated` is the asyncio.Event the stream task sets after each write.
     """
-    waited = 0
-    while True:
-        ready = all(snapshot.get(k) is not None for k in required_keys)
-        if ready:
-            print(f"[{now()}] {label} snapshot ready.")
-            return
-        await asyncio.sleep(poll)
-        waited += poll
-        if waited >= timeout:
-            raise TimeoutError(
-                f"{label} snapshot did not initialize in {timeout} seconds! Required: {required_keys}"
-            )
+    if not await _wait_until(
+        lambda: all(snapshot.get(k) is not None for k in required_keys),
+        updated,
+        timeout,
+    ):
+        raise TimeoutError(
+            f"{label} snapshot did not initialize in {timeout} seconds! Required: {required_keys}"
+        )
+    print(f"[{now()}] {label} snapshot ready.")
 
 
 async def wait_for_account_snapshot(
-    snapshot, required_key_paths, label="", timeout=10.0, poll=0.05
+    snapshot, required_key_paths, updated, label="", timeout=10.0
 ):
     """
     Wait until all nested key paths exist and are non-None in snapshot dict.
     required_key_paths: list of tuples, e.g. [("BTC", "free"), ("BTC", "locked"), ("BTC", "total")]
+    `updated` is the asyncio.Event the account receiver sets after each balance update.
     """
 
     def exists(snap, key_path):
@@ -328,18 +388,15 @@ async def wait_for_account_snapshot(
             d = d[k]
         return d is not None
 
-    waited = 0
-    while True:
-        ready = all(exists(snapshot, kp) for kp in required_key_paths)
-        if ready:
-            print(f"[{now()}] {label} snapshot ready.")
-            return
-        await asyncio.sleep(poll)
-        waited += poll
-        if waited >= timeout:
-            raise TimeoutError(
-                f"{label} snapshot did not initialize in {timeout} seconds! Required: {required_key_paths}"
-            )
+    if not await _wait_until(
+        lambda: all(exists(snapshot, kp) for kp in required_key_paths),
+        updated,
+        timeout,
+    ):
+        raise TimeoutError(
+            f"{label} snapshot did not initialize in {timeout} seconds! Required: {required_key_paths}"
+        )
+    print(f"[{now()}] {label} snapshot ready.")
 
 
 async def cancel_tasks(tasks):
@@ -387,34 +444,67 @@ async def prompt_continue(tasks, msg="Continue? (Y/N): "):
 
 def install_hotkey_listener(state, hotkey="x"):
     """
-    Cross-platform non-blocking stdin listener. Type the hotkey + Enter to arm exit.
-    Works on both Windows and POSIX systems using threading.
+    Non-blocking stdin listener. Type the hotkey + Enter to arm exit.
+    On POSIX, stdin is watched by the running event loop (loop.add_reader), so no
+    extra thread is needed; on Windows a background reader thread is used.
     Example: press 'x' then Enter.
 
     Automatically disabled when running as a systemd service (no TTY).
+    Must be called from within the running event loop.
     """
     # Check if we have a real terminal (not running as systemd service)
     if not sys.stdin.isatty():
         print(f"[{now()}] Hotkey listener disabled (no TTY - running as service)")
         return
 
+    def handle_line(line):
+        if line.strip().lower() == hotkey:
+            state.manual_exit_triggered = True
+            print(f"[{now()}] [HOTKEY] Manual maker-exit ARMED by '{hotkey}'")
+
+    if os.name != "nt":
+        loop = asyncio.get_running_loop()
+        fd = sys.stdin.fileno()
+        pending = bytearray()
+
+        def on_stdin_readable():
+            """Event-loop callback: read what is available and handle full lines."""
+            try:
+                data = os.read(fd, 4096)
+            except OSError as e:
+                print(f"[{now()}] [HOTKEY] stdin read error: {e}")
+                loop.remove_reader(fd)
+                return
+            if not data:  # EOF
+                loop.remove_reader(fd)
+                return
+            pending.extend(data)
+            while b"\n" in pending:
+                line, _, rest = pending.partition(b"\n")
+                pending[:] = rest
+                handle_line(line.decode(errors="replace"))
+
+        # Replaces any reader left over from a previous connection's loop run
+        loop.add_reader(fd, on_stdin_readable)
+        print(
+            f"[{now()}] Hotkey listener active (event loop). Type '{hotkey}' then Enter to arm exit."
+        )
+        return
+
     def stdin_reader_thread():
-        """Background thread to read stdin continuously."""
+        """Background thread to read stdin continuously (Windows fallback)."""
         while True:
             try:
-                line = sys.stdin.readline().strip().lower()
-                if line == hotkey:
-                    state.manual_exit_triggered = True
-                    print(f"[{now()}] [HOTKEY] Manual maker-exit ARMED by '{hotkey}'")
+                handle_line(sys.stdin.readline())
             except Exception as e:
                 print(f"[{now()}] [HOTKEY] stdin read error: {e}")
                 break
 
-    # Start daemon thread for stdin reading (works on all platforms)
+    # Start daemon thread for stdin reading (no add_reader for stdin on Windows)
     thread = threading.Thread(target=stdin_reader_thread, daemon=True)
     thread.start()
     print(
-        f"[{now()}] Hotkey listener active (cross-platform). Type '{hotkey}' then Enter to arm exit."
+        f"[{now()}] Hotkey listener active (thread). Type '{hotkey}' then Enter to arm exit."
     )
 
 
@@ -448,7 +538,7 @@ async def main_trading_loop(ws):
     Args:
         ws: Authenticated WebSocket connection to Binance API
     """
-    # === SECTION: Fetch, Normalize Historical Klines, and Baseline ATR ===
+    # === SECTION: Fetch Historical Klines and Baseline Donchian ===
     historical_klines = await fetch_kline_historical_custom_limit(
         ws,
         SYMBOL,
@@ -457,53 +547,62 @@ async def main_trading_loop(ws):
         time_zone="0",
     )
 
-    normalized_hist_klines = normalize_historical_klines(
-        historical_klines, SYMBOL, KLINE_INTERVAL
-    )
+    # Rolling window is stored column-wise (SoA) and capped at ROLLING_KLINES_MAXLEN.
+    # Historical rows are loaded straight into the columns, skipping the stream dicts.
+    rolling_klines = KlineBuffer(ROLLING_KLINES_MAXLEN)
+    rolling_klines.extend_rows(historical_klines)
     print(
-        f"[{now()}] Normalized {len(normalized_hist_klines)} historical klines to stream-compatible dict."
+        f"[{now()}] Start: {fmt_ts(int(rolling_klines.open_times[0]))} | "
+        f"End: {fmt_ts(rolling_klines.last_close_time)}"
     )
-
-    start_kline = normalized_hist_klines[0]
-    end_kline = normalized_hist_klines[-1]
-    print(
-        f"[{now()}] Start: {fmt_ts(start_kline['t'])} | End: {fmt_ts(end_kline['T'])}"
-    )
-
-    # At startup: fill with normalized historical klines (already aligned to stream structure)
-    rolling_klines = list(
-        normalized_hist_klines[-ROLLING_KLINES_MAXLEN:]
-    )  # Defensive slice
     print(f"[{now()}] Rolling klines initialized with {len(rolling_klines)} entries.")
 
-    # --- Baseline Donchian calculation (on historical, normalized klines) ---
-    donchian_upper, donchian_lower, donchian_mid = compute_donchian_channels(
-        normalized_hist_klines,
+    # --- Baseline Donchian calculation (warm up incremental state on history) ---
+    donchian = DonchianState(
         window=DONCHIAN_WINDOW,
         shift=DONCHIAN_SHIFT,
-        row_format="dict",  # normalized_hist_klines is a list of dicts
+        closes=rolling_klines.closes,
     )
+    last_upper, last_lower, last_mid = donchian.channels()
     print(
         f"[{now()}] Baseline Donchian: window={DONCHIAN_WINDOW}, shift={DONCHIAN_SHIFT} | "
-        f"Last upper={donchian_upper[-1]:.4f}, lower={donchian_lower[-1]:.4f}, mid={donchian_mid[-1]:.4f}"
+        f"Last upper={last_upper:.4f}, lower={last_lower:.4f}, mid={last_mid:.4f}"
     )
 
     # === SECTION: Subscribe, Start Streams, and Market Data Snapshot Readiness ===
     await subscribe_user_stream(ws)
     print(f"[{now()}] userDataStream subscribed.")
 
+    # Each producer sets its event after writing, so readiness waits wake on arrival.
+    # Book, account and kline updates all set market_updated, which wakes the
+    # trading loop; the kline stream also sets kline_updated (window dirty flag).
+    market_updated = asyncio.Event()
+
     account_snapshot = {}
-    _account_task = asyncio.create_task(account_ws_receiver(ws, account_snapshot))
+    _account_task = asyncio.create_task(
+        account_ws_receiver(ws, account_snapshot, market_updated)
+    )
 
     book_snapshot = {}
-    _book_task = asyncio.create_task(stream_bookticker_shared(SYMBOL, book_snapshot))
+    _book_task = asyncio.create_task(
+        stream_bookticker_shared(SYMBOL, book_snapshot, market_updated)
+    )
 
     kline_snapshot = {}
-    _kline_task = asyncio.create_task(stream_kline_shared(SYMBOL, "1m", kline_snapshot))
+    kline_updated = asyncio.Event()
+    _kline_task = asyncio.create_task(
+        stream_kline_shared(
+            SYMBOL, "1m", kline_snapshot, updated=kline_updated, wake=market_updated
+        )
+    )
 
     try:
         await wait_for_market_snapshot(
-            book_snapshot, ["bid_price", "ask_price"], label="BookTicker", timeout=10
+            book_snapshot,
+            ["bid_price", "ask_price"],
+            market_updated,
+            label="BookTicker",
+            timeout=10,
         )
         print(
             f"[{now()}] Bid={book_snapshot['bid_price']} | Ask={book_snapshot['ask_price']}"
@@ -513,7 +612,8 @@ async def main_trading_loop(ws):
 
         await wait_for_market_snapshot(
             kline_snapshot,
-            ["o", "c"],  # Official 'k' keys: open, close (both as strings)
+            ["o", "c"],  # Official 'k' keys: open, close (floats once ingested)
+            kline_updated,
             label="Kline",
             timeout=10,
         )
@@ -578,6 +678,7 @@ async def main_trading_loop(ws):
                 (QUOTE_ASSET, "locked"),
                 (QUOTE_ASSET, "total"),
             ],
+            market_updated,
             label="Account",
             timeout=15,
         )
@@ -600,22 +701,29 @@ async def main_trading_loop(ws):
     print(f"[{now()}] Press Ctrl-C to stop the bot gracefully.\n")
 
     # --- Main regime/trailing logic loop ---
+    # Close and channels as of the warmed-up window; the kline block below
+    # replaces them whenever the stream has written since the last tick
+    current_close = float(rolling_klines.closes[-1])
+    donchian_channels = donchian.channels()
+    kline_updated.set()  # First tick always ingests the live kline
+    loop = asyncio.get_running_loop()
     while True:
+        tick_deadline = loop.time() + LOOP_SLEEP_SEC
         # ====================================================================================================================================================
         # 1. Account & market data snapshot
         # ====================================================================================================================================================
 
         # --- Account & Market Data ---
-        balances = get_balance_from_snapshot(account_snapshot, BASE_ASSET, QUOTE_ASSET)
-        state.live_bal_free = balances["free"]
-        state.live_bal_locked = balances["locked"]
-        state.live_bal_total = balances["total"]
-        # print(f"[{now()}] DEBUG Live Balances | Free: {state.live_bal_free} | Locked: {state.live_bal_locked} | Total: {state.live_bal_total}")
+        state.bal = get_balance_from_snapshot(account_snapshot, BASE_ASSET, QUOTE_ASSET)
+        # Loop-local copies: read many times below, never reassigned within a tick
+        base_total = state.bal.base_total
+        quote_total = state.bal.quote_total
+        # print(f"[{now()}] DEBUG Live Balances | {state.bal}")
 
         bid = book_snapshot.get("bid_price")
         ask = book_snapshot.get("ask_price")
         if bid is None or ask is None:
-            await asyncio.sleep(0.1)
+            await wait_for_next_tick(market_updated, tick_deadline)
             continue
         # print(f"[{now()}] DEBUG BookTicker Bid: {bid} | Ask: {ask}")
 
@@ -624,51 +732,42 @@ async def main_trading_loop(ws):
         # ====================================================================================================================================================
 
         # --- Rolling Kline Window Management ---
-        current_kline = dict(kline_snapshot)
-
-        if not rolling_klines:
-            rolling_klines.append(current_kline)
-            # print(f"[{now()}] (INIT) Rolling klines: appended kline T={ts_dbg(current_kline['T'])} (len={len(rolling_klines)})")
-            # debug_print_last_klines(rolling_klines)
-        else:
-            last_kline = rolling_klines[-1]
-            if current_kline["T"] > last_kline["T"]:
-                # --- ALWAYS pop if at window maxlen before appending new forming kline ---
-                if len(rolling_klines) >= ROLLING_KLINES_MAXLEN:
-                    _ = rolling_klines.pop(0)
-                    # print(f"[{now()}] (POP) Popped oldest kline T={ts_dbg(popped['T'])} (len={len(rolling_klines)})")
+        # Only touch the window when the stream has written since the last tick;
+        # otherwise the previous close and channels are still current.
+        if kline_updated.is_set():
+            kline_updated.clear()
+            # The stream task replaces kline_snapshot without awaiting in between, so
+            # it is never seen half-written here; read it directly instead of copying.
+            current_kline = kline_snapshot
+            current_close = current_kline["c"]  # Parsed to float by the stream
+
+            if not len(rolling_klines):
                 rolling_klines.append(current_kline)
+                donchian_channels = donchian.update(current_close)
+                # print(f"[{now()}] (INIT) Rolling klines: appended kline T={ts_dbg(current_kline['T'])} (len={len(rolling_klines)})")
+            elif current_kline["T"] > rolling_klines.last_close_time:
+                # New forming kline; the buffer drops the oldest one at maxlen
+                rolling_klines.append(current_kline)
+                donchian_channels = donchian.update(current_close)
                 # print(f"[{now()}] (ADVANCE) Appended new kline T={ts_dbg(current_kline['T'])} (x={current_kline.get('x')}) (len={len(rolling_klines)})")
-                # debug_print_last_klines(rolling_klines)
             else:
-                rolling_klines[-1] = current_kline  # Update forming kline in place
+                # Update forming kline in place
+                rolling_klines.update_last(current_kline)
+                donchian_channels = donchian.amend(current_close)
                 # print(f"[{now()}] (UPDATE) Updated forming kline T={ts_dbg(current_kline['T'])} (x={current_kline.get('x')}) (len={len(rolling_klines)})")
-                # debug_print_last_klines(rolling_klines)
 
         # ====================================================================================================================================================
         # 3. Donchian calculation & gating
         # ====================================================================================================================================================
 
-        # --- Donchian channel (live, from merged kline stream) ---
-        donchian_upper, donchian_lower, donchian_mid = compute_donchian_channels(
-            rolling_klines,
-            window=DONCHIAN_WINDOW,
-            shift=DONCHIAN_SHIFT,
-            row_format="dict",  # rolling_klines is a list of dicts (Binance stream format)
-        )
-
-        last_upper = donchian_upper[-1]
-        last_lower = donchian_lower[-1]
-        last_mid = donchian_mid[-1]
+        # --- Donchian channel (live, updated incrementally with the kline window) ---
+        last_upper, last_lower, last_mid = donchian_channels
         donchian_width = last_upper - last_lower
 
         # print(f"[{now()}] Donchian: upper={last_upper:.4f}, lower={last_lower:.4f}, mid={last_mid:.4f} (window={DONCHIAN_WINDOW}, shift={DONCHIAN_SHIFT})")
 
         # --- Donchian Gating Logic ---
-        last_close = float(current_kline["c"])
-        if not hasattr(state, "donchian_gate_active"):
-            state.donchian_gate_active = False
-            state.last_donchian_regime = None
+        last_close = current_close
 
         # 1. Detect hard stop triggering (e.g., asset value drops threshold)
         #    (assume you set state.donchian_gate_active = True and state.last_donchian_regime = regime when hard stop fires)
@@ -680,11 +779,13 @@ async def main_trading_loop(ws):
                 # For hard stop SELL: require close > mid for re-entry
                 if last_close > last_mid:
                     # Calculate current value for re-anchoring
-                    reset_value = state.live_bal_total[BASE_ASSET] * bid
+                    reset_value = base_total * bid
                     # print(f"[{now()}] Donchian gate reset: close {last_close:.4f} > mid {last_mid:.4f} (BASE exit)")
-                    logger = get_logger()
                     logger.info(
-                        f"Donchian gate RESET: close {last_close:.4f} > mid {last_mid:.4f} (BASE exit), re-anchoring to {reset_value:.4f}"
+                        "Donchian gate RESET: close %.4f > mid %.4f (BASE exit), re-anchoring to %.4f",
+                        last_close,
+                        last_mid,
+                        reset_value,
                     )
                     state.donchian_gate_active = False
                     state.last_donchian_regime = None
@@ -695,13 +796,13 @@ async def main_trading_loop(ws):
                 # For hard stop BUY: require close < mid for re-entry
                 if last_close < last_mid:
                     # Calculate current value for re-anchoring
-                    reset_value = (
-                        (state.live_bal_total[QUOTE_ASSET] / ask) if ask > 0 else 0
-                    )
+                    reset_value = (quote_total / ask) if ask > 0 else 0
                     # print(f"[{now()}] Donchian gate reset: close {last_close:.4f} < mid {last_mid:.4f} (QUOTE exit)")
-                    logger = get_logger()
                     logger.info(
-                        f"Donchian gate RESET: close {last_close:.4f} < mid {last_mid:.4f} (QUOTE exit), re-anchoring to {reset_value:.4f}"
+                        "Donchian gate RESET: close %.4f < mid %.4f (QUOTE exit), re-anchoring to %.4f",
+                        last_close,
+                        last_mid,
+                        reset_value,
                     )
                     state.donchian_gate_active = False
                     state.last_donchian_regime = None
@@ -719,20 +820,17 @@ async def main_trading_loop(ws):
 
         # --- Regime Detection & Value Calculation ---
         prev_regime = state.current_regime
-        regime = detect_regime(state.live_bal_total, bid, ask)
+        regime = detect_regime(base_total, quote_total, bid, ask)
         state.current_regime = regime
 
+        if regime is None:
+            await wait_for_next_tick(market_updated, tick_deadline)
+            continue
+        value_unit, gain_scale_frac, min_gain_trigger_frac = _REGIME_PARAMS[regime]
         if regime == "BASE":
-            current_value = state.live_bal_total[BASE_ASSET] * bid
-            value_unit = QUOTE_ASSET
-            gain_scale_frac = GAIN_SCALE_FRAC_BASE
-        elif regime == "QUOTE":
-            current_value = (state.live_bal_total[QUOTE_ASSET] / ask) if ask > 0 else 0
-            value_unit = BASE_ASSET
-            gain_scale_frac = GAIN_SCALE_FRAC_QUOTE
+            current_value = base_total * bid
         else:
-            await asyncio.sleep(0.1)
-            continue
+            current_value = (quote_total / ask) if ask > 0 else 0
 
         # --- Always set anchor immediately after current_value ---
         anchor = state.anchor_value if state.anchor_value is not None else current_value
@@ -742,32 +840,21 @@ async def main_trading_loop(ws):
         # ====================================================================================================================================================
 
         # --- Min Gain Trigger by Static Fraction ---
-        min_gain_trigger_frac = (
-            MIN_GAIN_TRIGGER_FRAC_BASE
-            if regime == "BASE"
-            else MIN_GAIN_TRIGGER_FRAC_QUOTE
-        )
         min_gain_static = anchor * min_gain_trigger_frac
 
         # --- Min Gain Trigger by Fee + Buffer ---
-        min_gain_fee_buffer = anchor * (FEE + BUFFER)
+        min_gain_fee_buffer = anchor * _FEE_PLUS_BUFFER
 
         # --- Min Gain Trigger by Donchian Channel Width ---
         if regime == "BASE":
             # Profit required equals: (ETH held) × (price range in FDUSD) × multiplier
-            min_gain_donchian = (
-                state.live_bal_total[BASE_ASSET]
-                * donchian_width
-                * DONCHIAN_GAIN_MULTIPLIER
-            )
+            min_gain_donchian = base_total * donchian_width * DONCHIAN_GAIN_MULTIPLIER
         elif regime == "QUOTE":
             # Profit required equals: (FDUSD held) × (price range) × multiplier, converted to ETH via the anchored ask and new ask.
             # This gives the exact incremental ETH gained if ask drops by donchian_width.
             if ask > 0 and (ask - donchian_width) > 0:
                 min_gain_donchian = (
-                    state.live_bal_total[QUOTE_ASSET]
-                    * donchian_width
-                    * DONCHIAN_GAIN_MULTIPLIER
+                    quote_total * donchian_width * DONCHIAN_GAIN_MULTIPLIER
                 ) / (ask * (ask - donchian_width))
             else:
                 min_gain_donchian = 0.0
@@ -787,22 +874,24 @@ async def main_trading_loop(ws):
         if regime != prev_regime and regime is not None:
             state.reset_for_regime_flip(current_value)
             # print(f"[{now()}] Regime flip: {prev_regime} → {regime} | Anchor/high reset to {fmt(current_value)}")
-            logger = get_logger()
             logger.info(
-                f"Regime flip: {prev_regime} → {regime} | Anchor/high reset to {fmt(current_value)} | Symbol: {SYMBOL}"
+                "Regime flip: %s → %s | Anchor/high reset to %.8f | Symbol: %s",
+                prev_regime,
+                regime,
+                current_value,
+                SYMBOL,
             )
 
             # --- Compose comprehensive Telegram regime flip message ---
-            def fmt_bal(asset):
-                snap = account_snapshot.get(asset, {})
-                return (
-                    f"{asset}\n"
-                    f"  Free:   {snap.get('free', 0.0):.8f}\n"
-                    f"  Locked: {snap.get('locked', 0.0):.8f}"
-                )
-
-            price_lines = f"Bid: {bid:.2f}   Ask: {ask:.2f}\n"
-            donchian_lines = (
+            msg = (
+                f"{_REGIME_EMOJI.get(regime, '')} Regime Flip: {regime}\n"
+                f"Symbol: {SYMBOL}\n"
+                f"Time: {now()}\n"
+                f"Anchor: {state.anchor_value:.8f} {value_unit}\n"
+                f"Bid: {bid:.2f}   Ask: {ask:.2f}\n\n"
+                "All Balances:\n"
+                f"```{fmt_bal(account_snapshot, BASE_ASSET)}```\n"
+                f"```{fmt_bal(account_snapshot, QUOTE_ASSET)}```\n\n"
                 f"Donchian Channel (W={DONCHIAN_WINDOW}, Shift={DONCHIAN_SHIFT}):\n"
                 f"  Upper: {last_upper:.4f}\n"
                 f"  Lower: {last_lower:.4f}\n"
@@ -810,33 +899,20 @@ async def main_trading_loop(ws):
                 f"  Width: {donchian_width:.4f}\n"
                 f"Dynamic Min Gain: {min_gain_for_trigger:.8f} "
                 f"({value_unit}) [Donchian x {DONCHIAN_GAIN_MULTIPLIER:.2f}]\n"
-                f"Donchian Gate State: {'ACTIVE' if state.donchian_gate_active else 'INACTIVE'}"
+                f"Donchian Gate State: {'ACTIVE' if state.donchian_gate_active else 'INACTIVE'}\n"
             )
-
-            msg_lines = [
-                f"{'🟥' if regime == 'BASE' else '🟩' if regime == 'QUOTE' else ''} Regime Flip: {regime}",
-                f"Symbol: {SYMBOL}",
-                f"Time: {now()}",
-                f"Anchor: {state.anchor_value:.8f} {value_unit}",
-                price_lines,
-                "All Balances:",
-                f"```{fmt_bal(BASE_ASSET)}```",
-                f"```{fmt_bal(QUOTE_ASSET)}```",
-                "",
-                donchian_lines,
-                "",
-            ]
-
-            msg = "\n".join(msg_lines)
-            broadcast_telegram_message(msg)
+            # Sent by the background Telegram worker; the loop never waits on it
+            enqueue_telegram_message(msg)
 
         # ====================================================================================================================================================
         # 7. Update anchor/high/gain/drawdown/callback
         # ====================================================================================================================================================
 
         # --- Update Anchor, High, Gain/Drawdown, Callback Factor ---
-        anchor = state.anchor_value if state.anchor_value is not None else current_value
-        high = state.high_value if state.high_value is not None else anchor
+        _anchor = state.anchor_value
+        _high = state.high_value
+        anchor = _anchor if _anchor is not None else current_value
+        high = _high if _high is not None else anchor
 
         gain = high - anchor
         drawdown = high - current_value
@@ -846,7 +922,7 @@ async def main_trading_loop(ws):
         callback = gain * callback_factor
 
         # --- High Water Update ---
-        if current_value > (state.high_value or 0):
+        if current_value > (_high or 0.0):
             state.high_value = current_value
 
         # ====================================================================================================================================================
@@ -854,15 +930,18 @@ async def main_trading_loop(ws):
         # ====================================================================================================================================================
 
         # 1. Donchian hard stop trigger (ALWAYS RUNS)
-        if value_drop_frac(current_value, anchor) >= HARD_STOP_THRESHOLD_FRAC:
+        drop_frac = (anchor - current_value) / anchor if anchor else 0.0
+        if drop_frac >= HARD_STOP_THRESHOLD_FRAC:
             if not state.donchian_gate_active:
                 state.donchian_gate_active = True
                 state.last_donchian_regime = regime
                 state.hard_stop_armed = True
                 print(f"[{now()}] Donchian hard stop triggered: regime={regime}")
-                logger = get_logger()
                 logger.warning(
-                    f"Donchian hard stop triggered: regime={regime}, value_drop={value_drop_frac(current_value, anchor):.4%}, threshold={HARD_STOP_THRESHOLD_FRAC:.4%}"
+                    "Donchian hard stop triggered: regime=%s, value_drop=%.4f%%, threshold=%.4f%%",
+                    regime,
+                    drop_frac * 100,
+                    HARD_STOP_THRESHOLD_FRAC * 100,
                 )
             # (For BASE, persistent exit proceeds in order block below. For QUOTE, just pause/restrict until Donchian mid-cross.)
 
@@ -870,8 +949,8 @@ async def main_trading_loop(ws):
         if (
             regime == "BASE"
             and state.donchian_gate_active
-            and state.live_bal_total[BASE_ASSET] >= MIN_QTY
-            and (state.live_bal_total[BASE_ASSET] * bid) >= MIN_NOTIONAL
+            and base_total >= MIN_QTY
+            and (base_total * bid) >= MIN_NOTIONAL
         ):
             if not state.hard_stop_armed:
                 print(
@@ -880,7 +959,7 @@ async def main_trading_loop(ws):
             state.hard_stop_armed = True
 
         if state.hard_stop_armed and regime == "BASE":
-            qty = clip(state.live_bal_total[BASE_ASSET], LOT_SIZE)
+            qty = _fast_clip(base_total, LOT_SIZE)
             notional = qty * bid
             if qty >= MIN_QTY and notional >= MIN_NOTIONAL:
                 await order_replace(
@@ -895,16 +974,18 @@ async def main_trading_loop(ws):
                 print(
                     f"[{now()}] HARD_STOP LIMIT_MAKER SELL SENT | Qty: {qty:.8f} | Price: {bid:.2f}"
                 )
-                logger = get_logger()
                 logger.warning(
-                    f"Hard stop SELL order sent: Qty={qty:.8f}, Price={bid:.2f}, Notional={notional:.2f}"
+                    "Hard stop SELL order sent: Qty=%.8f, Price=%.2f, Notional=%.2f",
+                    qty,
+                    bid,
+                    notional,
                 )
 
         # 3. QUOTE regime: just pause trading (no order to send)
         elif (
             regime == "QUOTE"
             and state.donchian_gate_active
-            and state.live_bal_total[QUOTE_ASSET] >= MIN_NOTIONAL
+            and quote_total >= MIN_NOTIONAL
         ):
             if not state.hard_stop_armed:
                 print(
@@ -927,12 +1008,12 @@ async def main_trading_loop(ws):
             if state.maker_exit_armed:
                 side = "BUY" if regime == "QUOTE" else "SELL"
                 if side == "BUY":
-                    max_spend = state.live_bal_total[QUOTE_ASSET]
-                    qty = clip((max_spend / ask), LOT_SIZE)
+                    max_spend = quote_total
+                    qty = _fast_clip(max_spend / ask, LOT_SIZE)
                     price = ask
                     client_id = "BUY"
                 else:
-                    qty = clip(state.live_bal_total[BASE_ASSET], LOT_SIZE)
+                    qty = _fast_clip(base_total, LOT_SIZE)
                     price = bid
                     client_id = "SELL"
 
@@ -950,63 +1031,58 @@ async def main_trading_loop(ws):
                     print(
                         f"[{now()}] LIMIT_MAKER {side} SENT | Qty: {qty:.8f} | Price: {price:.2f}"
                     )
-                    logger = get_logger()
                     logger.info(
-                        f"Maker exit {side} order sent: Qty={qty:.8f}, Price={price:.2f}, Notional={notional:.2f}, Regime={regime}"
+                        "Maker exit %s order sent: Qty=%.8f, Price=%.2f, Notional=%.2f, Regime=%s",
+                        side,
+                        qty,
+                        price,
+                        notional,
+                        regime,
                     )
 
         # ====================================================================================================================================================
         # 9. Print running state and diagnostics
         # ====================================================================================================================================================
 
-        value_drop = anchor - current_value
-        value_drop_frac_pct = 100 * value_drop / anchor if anchor > 0 else 0
-        hard_stop_thresh_pct = 100 * HARD_STOP_THRESHOLD_FRAC
-
-        # --- Print running state ---
-        print("\n" + "=" * 60)
-        print(f"[{now()}] Regime: {regime} | Symbol: {SYMBOL}")
-        print(f"  Bid:  {bid:.8f}   Ask: {ask:.8f}")
-        print(
-            f"  Free:  {state.live_bal_free[BASE_ASSET]:.8f} {BASE_ASSET} | {state.live_bal_free[QUOTE_ASSET]:.2f} {QUOTE_ASSET}"
-        )
-        print(
-            f"  Total: {state.live_bal_total[BASE_ASSET]:.8f} {BASE_ASSET} | {state.live_bal_total[QUOTE_ASSET]:.2f} {QUOTE_ASSET}"
-        )
-        print(f"  Anchor:    {fmt(state.anchor_value)}")
-        print(
-            f"  Current:   {fmt(current_value)} ({value_unit}) | "
-            f"Drop from anchor: {fmt(value_drop)} ({value_drop_frac_pct:.4f}%) "
-            f"[Hard Stop Thresh: {HARD_STOP_THRESHOLD_FRAC:.5f} ({hard_stop_thresh_pct:.4f}%)]"
-        )
-        print(f"  High:      {fmt(state.high_value)}")
-        print("-" * 60)
-        # --- Donchian Diagnostics ---
-        print(f"  Donchian Channel (W={DONCHIAN_WINDOW}, Shift={DONCHIAN_SHIFT}):")
-        print(
-            f"    Upper: {last_upper:.4f} | Lower: {last_lower:.4f} | Mid: {last_mid:.4f} | Width: {donchian_width:.4f}"
-        )
-        print(
-            f"    Donchian Gain Mult: {DONCHIAN_GAIN_MULTIPLIER:.3f} | Donchian Gate: {'ACTIVE' if state.donchian_gate_active else 'INACTIVE'}"
-        )
-        print(
-            f"    Last Donchian Regime: {state.last_donchian_regime if hasattr(state, 'last_donchian_regime') else 'N/A'}"
-        )
-        print("-" * 60)
-        print(
-            f"  Gain: {fmt(gain)} | Gain Scale: {fmt(gain_scale)} | Gain/Gain Scale: {(gain / gain_scale):.4f}"
-            if gain_scale
-            else "N/A"
-        )
-        print(
-            f"  Min Gain for Trigger: {fmt(min_gain_for_trigger)} | "
-            f"Min Gain (anchor): {fmt(state.anchor_value * min_gain_trigger_frac)} | "
-            f"Min Gain (fee + buffer): {fmt(state.anchor_value * (FEE + BUFFER))} | "
-            f"Min Gain (Donchian): {fmt(min_gain_donchian)}"
-        )
-        print(f"  Callback:  {fmt(callback)} (Callback Factor: {callback_factor:.5f})")
-        print(f"  Drawdown:  {fmt(drawdown)}")
-        print("-" * 60)
+        # Built as one string and written with a single print(): one stdout lock and
+        # flush per tick instead of ~20. Skipped entirely when diagnostics are off.
+        if PRINT_DIAGNOSTICS:
+            value_drop = anchor - current_value
+            value_drop_frac_pct = 100 * value_drop / anchor if anchor > 0 else 0
+            hard_stop_thresh_pct = 100 * HARD_STOP_THRESHOLD_FRAC
+            rule = "-" * 60
+
+            # --- Print running state ---
+            lines = [
+                "\n" + "=" * 60,
+                f"[{now()}] Regime: {regime} | Symbol: {SYMBOL}",
+                f"  Bid:  {bid:.8f}   Ask: {ask:.8f}",
+                f"  Free:  {state.bal.base_free:.8f} {BASE_ASSET} | {state.bal.quote_free:.2f} {QUOTE_ASSET}",
+                f"  Total: {base_total:.8f} {BASE_ASSET} | {quote_total:.2f} {QUOTE_ASSET}",
+                f"  Anchor:    {fmt(state.anchor_value)}",
+                f"  Current:   {fmt(current_value)} ({value_unit}) | "
+                f"Drop from anchor: {fmt(value_drop)} ({value_drop_frac_pct:.4f}%) "
+                f"[Hard Stop Thresh: {HARD_STOP_THRESHOLD_FRAC:.5f} ({hard_stop_thresh_pct:.4f}%)]",
+                f"  High:      {fmt(state.high_value)}",
+                rule,
+                # --- Donchian Diagnostics ---
+                f"  Donchian Channel (W={DONCHIAN_WINDOW}, Shift={DONCHIAN_SHIFT}):",
+                f"    Upper: {last_upper:.4f} | Lower: {last_lower:.4f} | Mid: {last_mid:.4f} | Width: {donchian_width:.4f}",
+                f"    Donchian Gain Mult: {DONCHIAN_GAIN_MULTIPLIER:.3f} | Donchian Gate: {'ACTIVE' if state.donchian_gate_active else 'INACTIVE'}",
+                f"    Last Donchian Regime: {state.last_donchian_regime}",
+                rule,
+                f"  Gain: {fmt(gain)} | Gain Scale: {fmt(gain_scale)} | Gain/Gain Scale: {(gain / gain_scale):.4f}"
+                if gain_scale
+                else "N/A",
+                f"  Min Gain for Trigger: {fmt(min_gain_for_trigger)} | "
+                f"Min Gain (anchor): {fmt(state.anchor_value * min_gain_trigger_frac)} | "
+                f"Min Gain (fee + buffer): {fmt(state.anchor_value * _FEE_PLUS_BUFFER)} | "
+                f"Min Gain (Donchian): {fmt(min_gain_donchian)}",
+                f"  Callback:  {fmt(callback)} (Callback Factor: {callback_factor:.5f})",
+                f"  Drawdown:  {fmt(drawdown)}",
+                rule,
+            ]
+            print("\n".join(lines))
 
         # ====================================================================================================================================================
         # ====================================================================================================================================================
@@ -1019,7 +1095,10 @@ async def main_trading_loop(ws):
         # if not bypass_trading_blocks:
         # --- BYPASSABLE BLOCKS END ---
 
-        await asyncio.sleep(LOOP_SLEEP_SEC)
+        # Idle until the book, balances or kline change, but never past the tick
+        # deadline (LOOP_SLEEP_SEC from tick start): stops, the hotkey exit and
+        # diagnostics keep running in a quiet market or if a stream stalls.
+        await wait_for_next_tick(market_updated, tick_deadline)
 
 
 async def run_with_reconnect():
@@ -1049,45 +1128,59 @@ async def run_with_reconnect():
     logger = setup_logging()
     logger.info("=== Trailing Edge Trading Bot Starting ===")
 
+    # One notification worker for the whole run; it survives WS reconnects
+    telegram_task = asyncio.create_task(telegram_worker())
+
     retry_wait = 5
-    while True:
-        try:
-            print(f"[{now()}] Connecting to Binance WebSocket API...")
-            logger.info("Connecting to Binance WebSocket API...")
-            async with websockets.connect(
-                "wss://ws-api.binance.com:443/ws-api/v3"
-            ) as ws:
-                logon_response = await send_session_logon(ws)
-                if logon_response.get("status") != 200:
-                    print(f"[{now()}] Logon failed: {logon_response}")
-                    logger.error(f"Authentication failed: {logon_response}")
-                    return
-                print(f"[{now()}] Authenticated to Binance WS API.")
-                logger.info("Successfully authenticated to Binance WS API")
-                await main_trading_loop(ws)
-        except KeyboardInterrupt:
-            print(
-                f"\n[{now()}] [SHUTDOWN] Ctrl-C detected. Shutting down gracefully..."
-            )
-            logger.info("Shutdown requested by user (Ctrl-C)")
-            return
-        except websockets.exceptions.ConnectionClosedError as e:
-            print(f"[{now()}] [WS ERROR] Code={e.code} Reason={e.reason}")
-            logger.error(
-                f"WebSocket connection closed: Code={e.code} Reason={e.reason}"
-            )
-        except Exception as e:
-            print(f"[{now()}] [ERROR] WebSocket error or connection lost: {e}")
-            logger.error(f"WebSocket error or connection lost: {type(e).__name__}: {e}")
-        print(f"[{now()}] Attempting to reconnect in {retry_wait} seconds...")
-        logger.info(f"Attempting to reconnect in {retry_wait} seconds...")
-        await asyncio.sleep(retry_wait)
+    try:
+        while True:
+            try:
+                print(f"[{now()}] Connecting to Binance WebSocket API...")
+                logger.info("Connecting to Binance WebSocket API...")
+                # Small JSON frames: permessage-deflate costs more CPU than it saves
+                async with websockets.connect(
+                    "wss://ws-api.binance.com:443/ws-api/v3", compression=None
+                ) as ws:
+                    logon_response = await send_session_logon(ws)
+                    if logon_response.get("status") != 200:
+                        print(f"[{now()}] Logon failed: {logon_response}")
+                        logger.error("Authentication failed: %s", logon_response)
+                        return
+                    print(f"[{now()}] Authenticated to Binance WS API.")
+                    logger.info("Successfully authenticated to Binance WS API")
+                    await main_trading_loop(ws)
+            except KeyboardInterrupt:
+                print(
+                    f"\n[{now()}] [SHUTDOWN] Ctrl-C detected. Shutting down gracefully..."
+                )
+                logger.info("Shutdown requested by user (Ctrl-C)")
+                return
+            except websockets.exceptions.ConnectionClosedError as e:
+                print(f"[{now()}] [WS ERROR] Code={e.code} Reason={e.reason}")
+                logger.error(
+                    "WebSocket connection closed: Code=%s Reason=%s", e.code, e.reason
+                )
+            except Exception as e:
+                print(f"[{now()}] [ERROR] WebSocket error or connection lost: {e}")
+                logger.error(
+                    "WebSocket error or connection lost: %s: %s", type(e).__name__, e
+                )
+            print(f"[{now()}] Attempting to reconnect in {retry_wait} seconds...")
+            logger.info("Attempting to reconnect in %s seconds...", retry_wait)
+            await asyncio.sleep(retry_wait)
+    finally:
+        # Deliver alerts still queued (bounded wait), then stop the worker cleanly
+        await flush_telegram_queue()
+        telegram_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await telegram_task
 
 
 def main():
     """Entry point for console_scripts and __main__."""
+    run = uvloop.run if uvloop is not None else asyncio.run
     try:
-        asyncio.run(run_with_reconnect())
+        run(run_with_reconnect())
     except KeyboardInterrupt:
         print(f"\n[{now()}] Bot stopped by user.")
         sys.exit(0)
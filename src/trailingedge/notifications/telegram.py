@@ -6,17 +6,15 @@ Supports Markdown-formatted messages for trade alerts, errors, and status notifi
 Supports sending to single, group, or multiple recipients.
 """
 
+import asyncio
 import logging
 import os
 
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger("trailingedge")
 
-# Load environment variables from project root
-load_dotenv()
-
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")  # Personal chat
 TELEGRAM_GROUP_CHAT_ID_GLOBAL = os.getenv(
@@ -25,6 +23,25 @@ TELEGRAM_GROUP_CHAT_ID_GLOBAL = os.getenv(
 TELEGRAM_GROUP_CHAT_ID_1 = os.getenv("TELEGRAM_GROUP_CHAT_ID_1")  # Group chat 1
 TELEGRAM_GROUP_CHAT_ID_2 = os.getenv("TELEGRAM_GROUP_CHAT_ID_2")  # Group chat 2
 
+# One pooled session for the bot's lifetime: keep-alive and TLS reuse across alerts
+_TG_SESSION = requests.Session()
+_TG_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+TELEGRAM_MAX_MESSAGE_LEN = 4096  # Telegram sendMessage text limit
+_BATCH_SEPARATOR = "\n---\n"
+# Debounce: alerts arriving within this window of the last send are held and
+# merged into the next batch, so choppy regime flips cannot flood the chat
+TELEGRAM_MIN_SEND_INTERVAL_SEC = 2.0
+# Shutdown: how long flush_telegram_queue() waits for queued alerts to go out
+TELEGRAM_FLUSH_TIMEOUT_SEC = 5.0
+
+# Outbound alerts waiting for telegram_worker(); bounded so a dead network cannot
+# grow memory without limit (the oldest alert is dropped when full)
+TELEGRAM_QUEUE_MAXSIZE = 256
+# Created inside the running loop (see _get_queue/telegram_worker), never at
+# import time, so it is not bound to a loop from an earlier asyncio.run
+_queue: asyncio.Queue[str] | None = None
+
 
 def send_telegram_message(
     message: str, chat_id: str = None, return_response: bool = False
@@ -49,7 +66,7 @@ def send_telegram_message(
     payload = {"chat_id": target_chat_id, "text": message, "parse_mode": "Markdown"}
 
     try:
-        response = requests.post(url, data=payload, timeout=5)
+        response = _TG_SESSION.post(url, data=payload, timeout=5)
         if return_response:
             return response
         if response.status_code != 200:
@@ -65,6 +82,17 @@ def send_telegram_message(
         return False
 
 
+def _default_chat_ids():
+    """Broadcast recipients configured in .env (group chats)."""
+    chat_id_list = []
+    # if TELEGRAM_GROUP_CHAT_ID_GLOBAL: chat_id_list.append(TELEGRAM_GROUP_CHAT_ID_GLOBAL)
+    if TELEGRAM_GROUP_CHAT_ID_1:
+        chat_id_list.append(TELEGRAM_GROUP_CHAT_ID_1)
+    if TELEGRAM_GROUP_CHAT_ID_2:
+        chat_id_list.append(TELEGRAM_GROUP_CHAT_ID_2)
+    return chat_id_list
+
+
 def broadcast_telegram_message(
     message: str, chat_id_list=None, return_response: bool = False
 ):
@@ -75,12 +103,7 @@ def broadcast_telegram_message(
     Returns the number of successful deliveries (or list of responses if return_response=True).
     """
     if chat_id_list is None:
-        chat_id_list = []
-        # if TELEGRAM_GROUP_CHAT_ID_GLOBAL: chat_id_list.append(TELEGRAM_GROUP_CHAT_ID_GLOBAL)
-        if TELEGRAM_GROUP_CHAT_ID_1:
-            chat_id_list.append(TELEGRAM_GROUP_CHAT_ID_1)
-        if TELEGRAM_GROUP_CHAT_ID_2:
-            chat_id_list.append(TELEGRAM_GROUP_CHAT_ID_2)
+        chat_id_list = _default_chat_ids()
 
     count = 0
     responses = []
@@ -96,6 +119,120 @@ def broadcast_telegram_message(
     return responses if return_response else count
 
 
+async def broadcast_telegram_message_async(message: str, chat_id_list=None) -> int:
+    """
+    Async broadcast for use inside the event loop.
+    Each recipient is sent from a worker thread and all run concurrently, so a
+    slow Telegram round-trip never blocks websocket reads or order placement.
+    Returns the number of successful deliveries.
+    """
+    if chat_id_list is None:
+        chat_id_list = _default_chat_ids()
+    results = await asyncio.gather(
+        *(
+            asyncio.to_thread(send_telegram_message, message, chat_id=cid)
+            for cid in chat_id_list
+            if cid
+        )
+    )
+    return sum(1 for ok in results if ok)
+
+
+def _get_queue() -> asyncio.Queue[str]:
+    """Return the alert queue, creating it on first use."""
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=TELEGRAM_QUEUE_MAXSIZE)
+    return _queue
+
+
+def enqueue_telegram_message(message: str):
+    """
+    Queue a broadcast for telegram_worker() without waiting on the network.
+    If the queue is full, the oldest pending alert is dropped to make room.
+    """
+    queue = _get_queue()
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        queue.get_nowait()
+        queue.task_done()  # Dropped, never sent: keep join() accounting right
+        queue.put_nowait(message)
+        logger.warning("Telegram queue full: dropped oldest pending alert")
+
+
+async def telegram_worker():
+    """
+    Drain the alert queue forever, broadcasting queued messages in batches.
+    Alerts that are already waiting are joined into one message (up to the
+    Telegram length limit) so bursts of regime flips cost one round-trip.
+    Sends are spaced at least TELEGRAM_MIN_SEND_INTERVAL_SEC apart; alerts
+    arriving inside that window are held and merged into the next batch.
+    Alerts are marked done only once their batch was sent (see
+    flush_telegram_queue). The queue is (re)created here, in the worker's own loop; alerts enqueued
+    before the worker started are carried over.
+    """
+    global _queue
+    queue: asyncio.Queue[str] = asyncio.Queue(maxsize=TELEGRAM_QUEUE_MAXSIZE)
+    while _queue is not None and not _queue.empty():
+        queue.put_nowait(_queue.get_nowait())
+        _queue.task_done()  # Now owned by the new queue
+    _queue = queue
+
+    loop = asyncio.get_running_loop()
+    last_sent = float("-inf")
+    carry = None
+    while True:
+        batch = carry if carry is not None else await queue.get()
+        carry = None
+        batch_items = 1
+        wait = last_sent + TELEGRAM_MIN_SEND_INTERVAL_SEC - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        while not queue.empty():
+            nxt = queue.get_nowait()
+            if len(batch) + len(_BATCH_SEPARATOR) + len(nxt) > TELEGRAM_MAX_MESSAGE_LEN:
+                carry = nxt
+                break
+            batch += _BATCH_SEPARATOR + nxt
+            batch_items += 1
+        try:
+            await broadcast_telegram_message_async(batch)
+        except Exception as e:
+            logger.error("Telegram worker error: %s: %s", type(e).__name__, e)
+        for _ in range(batch_items):
+            queue.task_done()
+        last_sent = loop.time()
+
+
+async def flush_telegram_queue(timeout: float = TELEGRAM_FLUSH_TIMEOUT_SEC) -> bool:
+    """
+    Wait for telegram_worker() to send every queued alert, for at most timeout
+    seconds. Call before cancelling the worker at shutdown.
+    Returns True if the queue drained, False if alerts were left unsent.
+    """
+
+    async def join_current():
+        # A worker starting meanwhile swaps in its own queue; follow it
+        queue = _queue
+        while queue is not None:
+            await queue.join()
+            if queue is _queue:
+                return
+            queue = _queue
+
+    try:
+        await asyncio.wait_for(join_current(), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Telegram queue not drained in %.1fs: %d alert(s) left unsent",
+            timeout,
+            _queue.qsize() if _queue is not None else 0,
+        )
+        return False
+
+
 # Internal test
 if __name__ == "__main__":
     print("\n[Internal Test] Broadcasting to all configured recipients...")
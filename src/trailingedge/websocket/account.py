@@ -6,9 +6,12 @@ Handles account info, commission, open orders, and user data stream.
 
 import asyncio
 import csv
-import json
+import functools
+import io
 from datetime import datetime, timedelta, timezone
 
+import orjson
+
 from trailingedge.auth.manager import get_server_timestamp, send_session_logon
 
 WS_URL = "wss://ws-api.binance.com:443/ws-api/v3"
@@ -17,6 +20,12 @@ WS_URL = "wss://ws-api.binance.com:443/ws-api/v3"
 SYMBOL = "ETHFDUSD"
 OUTPUT_TRADES_CSV = f"output/{SYMBOL.lower()}_mytrades.csv"
 UTC_OFFSET = 7  # +7 for Jakarta/Singapore
+LOCAL_TZ = timezone(timedelta(hours=UTC_OFFSET))
+
+# Session-stable request bodies, serialized once (sent as text frames)
+_SUBSCRIBE_USER_STREAM_PAYLOAD = orjson.dumps(
+    {"id": "subscribe_user_stream", "method": "userDataStream.subscribe"}
+)
 
 
 def now():
@@ -25,55 +34,69 @@ def now():
     return datetime.now().strftime("%H:%M:%S.%f")[:-3]
 
 
-async def fetch_exchange_info(ws, symbol="BTCFDUSD"):
+@functools.lru_cache(maxsize=16)
+def _exchange_info_payload(symbol):
+    """Serialized exchangeInfo request for a symbol (it has no dynamic fields)."""
     payload = {
         "id": "exchange_info",
         "method": "exchangeInfo",
         "params": {"symbols": [symbol]},
     }
-    await ws.send(json.dumps(payload))
+    return orjson.dumps(payload)
+
+
+async def fetch_exchange_info(ws, symbol="BTCFDUSD"):
+    await ws.send(_exchange_info_payload(symbol), text=True)
     response = await ws.recv()
-    return json.loads(response)
+    return orjson.loads(response)
 
 
 async def fetch_account_status(ws):
     payload = {
         "id": "account_status",
         "method": "account.status",
-        "params": {"timestamp": get_server_timestamp(), "omitZeroBalances": True},
+        "params": {
+            "timestamp": get_server_timestamp(),
+            "omitZeroBalances": True,
+        },
     }
-    await ws.send(json.dumps(payload))
+    await ws.send(orjson.dumps(payload), text=True)
     response = await ws.recv()
-    return json.loads(response)
+    return orjson.loads(response)
 
 
 async def fetch_account_commission(ws, symbol="BTCFDUSD"):
     payload = {
         "id": "account_commission",
         "method": "account.commission",
-        "params": {"symbol": symbol, "timestamp": get_server_timestamp()},
+        "params": {
+            "symbol": symbol,
+            "timestamp": get_server_timestamp(),
+        },
     }
-    await ws.send(json.dumps(payload))
+    await ws.send(orjson.dumps(payload), text=True)
     response = await ws.recv()
-    return json.loads(response)
+    return orjson.loads(response)
 
 
 async def fetch_open_orders(ws, symbol="BTCFDUSD"):
     payload = {
         "id": "open_orders",
         "method": "openOrders.status",
-        "params": {"symbol": symbol, "timestamp": get_server_timestamp()},
+        "params": {
+            "symbol": symbol,
+            "timestamp": get_server_timestamp(),
+        },
     }
-    await ws.send(json.dumps(payload))
+    await ws.send(orjson.dumps(payload), text=True)
     response = await ws.recv()
-    return json.loads(response)
+    return orjson.loads(response)
 
 
 async def subscribe_user_stream(ws):
-    payload = {"id": "subscribe_user_stream", "method": "userDataStream.subscribe"}
-    await ws.send(json.dumps(payload))
+    await ws.send(_SUBSCRIBE_USER_STREAM_PAYLOAD, text=True)
     response = await ws.recv()
-    return json.loads(response)
+    return orjson.loads(response)
 
 
 async def fetch_account_trade_history(
@@ -86,23 +109,24 @@ async def fetch_account_trade_history(
     limit=500,
     recv_window=None,
 ):
-    payload = {
-        "id": "account_trade_history",
-        "method": "myTrades",
-        "params": {
-            "symbol": symbol,
-            "timestamp": get_server_timestamp(),
-            **({"orderId": order_id} if order_id is not None else {}),
-            **({"startTime": start_time} if start_time is not None else {}),
-            **({"endTime": end_time} if end_time is not None else {}),
-            **({"fromId": from_id} if from_id is not None else {}),
-            **({"limit": limit} if limit is not None else {}),
-            **({"recvWindow": recv_window} if recv_window is not None else {}),
-        },
+    params = {
+        "symbol": symbol,
+        "timestamp": get_server_timestamp(),
     }
-    await ws.send(json.dumps(payload))
+    for k, v in (
+        ("orderId", order_id),
+        ("startTime", start_time),
+        ("endTime", end_time),
+        ("fromId", from_id),
+        ("limit", limit),
+        ("recvWindow", recv_window),
+    ):
+        if v is not None:
+            params[k] = v
+    payload = {"id": "account_trade_history", "method": "myTrades", "params": params}
+    await ws.send(orjson.dumps(payload), text=True)
     response = await ws.recv()
-    return json.loads(response)
+    return orjson.loads(response)
 
 
 if __name__ == "__main__":
@@ -119,24 +143,26 @@ if __name__ == "__main__":
             if logon_response.get("status") != 200:
                 print("Logon failed.")
                 return
-            print(f"\n[01] Logon Response:\n{json.dumps(logon_response, indent=2)}")
+            print(
+                f"\n[01] Logon Response:\n{orjson.dumps(logon_response, option=orjson.OPT_INDENT_2).decode()}"
+            )
 
             # 2. Fetch Account Status
             print("\n[02] Fetching account status...")
             result_status = await fetch_account_status(ws)
-            print(json.dumps(result_status, indent=2))
+            print(orjson.dumps(result_status, option=orjson.OPT_INDENT_2).decode())
 
             # 3. Fetch Account Commission
             print(f"\n[03] Fetching commission ({SYMBOL})...")
             result_comm = await fetch_account_commission(ws, symbol=SYMBOL)
-            print(json.dumps(result_comm, indent=2))
+            print(orjson.dumps(result_comm, option=orjson.OPT_INDENT_2).decode())
 
             # 4. Fetch Account Trade History (recent fills only, no start/end)
             print(f"\n[04] Fetching account trade history ({SYMBOL}, recent fills)...")
             result_trades = await fetch_account_trade_history(
                 ws, symbol=SYMBOL, limit=10
             )
-            print(json.dumps(result_trades, indent=2))
+            print(orjson.dumps(result_trades, option=orjson.OPT_INDENT_2).decode())
 
             # 5. --- Save to CSV file with readable time_hms ---
             trades = result_trades.get("result", [])
@@ -157,16 +183,17 @@ if __name__ == "__main__":
                     "isBestMatch",
                     "time_hms",
                 ]
+                for row in trades:
+                    row["time_hms"] = datetime.fromtimestamp(
+                        int(row["time"]) // 1000, tz=LOCAL_TZ
+                    ).strftime("%Y-%m-%d %H:%M:%S")
+                # Render the whole CSV in memory, then write the file in one call
+                buf = io.StringIO()
+                writer = csv.DictWriter(buf, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(trades)
                 with open(OUTPUT_TRADES_CSV, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    for row in trades:
-                        ts = int(row["time"]) // 1000
-                        dt = datetime.fromtimestamp(ts, tz=timezone.utc) + timedelta(
-                            hours=UTC_OFFSET
-                        )
-                        row["time_hms"] = dt.strftime("%Y-%m-%d %H:%M:%S")
-                        writer.writerow(row)
+                    f.write(buf.getvalue())
                 print(
                     f"[05] Trade history saved to {OUTPUT_TRADES_CSV} (CSV, ready for Google Sheets)"
                 )
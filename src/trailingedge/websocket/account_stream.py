@@ -5,9 +5,10 @@ Parses outboundAccountPosition (balance update) and updates a shared dict.
 """
 
 import asyncio
-import json
+from dataclasses import dataclass
 from datetime import datetime
 
+import orjson
 import websockets
 
 from trailingedge.auth.manager import send_session_logon
@@ -18,21 +19,27 @@ WS_URL = "wss://ws-api.binance.com:443/ws-api/v3"
 BASE_ASSET = "BTC"
 QUOTE_ASSET = "FDUSD"
 
+_BALANCE_EVENT = "outboundAccountPosition"
+_BALANCE_EVENT_BYTES = _BALANCE_EVENT.encode()
+_EMPTY_BALANCE: dict[str, float] = {}  # Shared read-only default for missing assets
+
 
 def now():
     """Return current local time for logs, always in YYYY-MM-DD HH:MM:SS."""
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-async def account_ws_receiver(ws, snapshot_dict):
+async def account_ws_receiver(ws, snapshot_dict, updated=None):
     """
     Listens for WS messages and updates snapshot_dict for balance changes.
     Never breaks on error; always continues unless ws is closed.
+    If given, the asyncio.Event `updated` is set after every balance update.
     """
     while True:
         try:
-            msg = await ws.recv()
-            parse_account_balance_event(msg, snapshot_dict)
+            msg = await ws.recv(decode=False)  # parser takes bytes; skip UTF-8 decode
+            if parse_account_balance_event(msg, snapshot_dict) and updated is not None:
+                updated.set()
         except websockets.exceptions.ConnectionClosed:
             print(
                 f"[{now()}] [ERROR] WS connection closed in account_ws_receiver, exiting loop."
@@ -43,65 +50,73 @@ async def account_ws_receiver(ws, snapshot_dict):
             continue  # <-- Continue for all other (parsing/noise) errors
 
 
-def parse_account_balance_event(message: str, snapshot_dict: dict) -> bool:
+def parse_account_balance_event(message: str | bytes, snapshot_dict: dict) -> bool:
     """
     Parse account balance update event and update snapshot dictionary.
     Returns True if successfully parsed, False otherwise.
+    Frames that do not mention the event type (order acks, other events) are
+    rejected with a substring scan before any JSON decoding.
     """
-    try:
-        data = json.loads(message)
-        # Defensive parse: skip if not a dict or missing expected keys
-        if not isinstance(data, dict):
+    if isinstance(message, bytes):
+        if _BALANCE_EVENT_BYTES not in message:
             return False
-        if "event" in data:
-            data = data["event"]
-        # Only process if it's the right event type
-        if data.get("e") == "outboundAccountPosition":
-            for entry in data.get("B", []):
-                asset = entry["a"]
-                free = float(entry["f"])
-                locked = float(entry["l"])
-                snapshot_dict[asset] = {
-                    "free": free,
-                    "locked": locked,
-                    "total": free + locked,
-                }
-            return True
-        # Not an account update event
+    elif _BALANCE_EVENT not in message:
         return False
-    except Exception:
-        # Instead of spamming, you can log once, or suppress completely
-        # print(f"[{now()}] Non-account message skipped: {e}")
+    try:
+        data = orjson.loads(message)
+    except orjson.JSONDecodeError:
         return False
+    # Defensive parse: skip if not a dict or missing expected keys
+    if isinstance(data, dict) and "event" in data:
+        data = data["event"]
+    # Only process if it's the right event type
+    if not isinstance(data, dict) or data.get("e") != _BALANCE_EVENT:
+        return False
+    try:
+        for entry in data.get("B", []):
+            asset = entry["a"]
+            free = float(entry["f"])
+            locked = float(entry["l"])
+            snapshot_dict[asset] = {
+                "free": free,
+                "locked": locked,
+                "total": free + locked,
+            }
+    except (KeyError, ValueError, TypeError):
+        return False
+    return True
+
+
+@dataclass(slots=True)
+class Balances:
+    """Free/locked/total balances of the traded pair, one flat field each."""
+
+    base_free: float = 0.0
+    base_locked: float = 0.0
+    base_total: float = 0.0
+    quote_free: float = 0.0
+    quote_locked: float = 0.0
+    quote_total: float = 0.0
 
 
 def get_balance_from_snapshot(
     snapshot_dict: dict, base_asset: str, quote_asset: str
-) -> dict[str, dict[str, float]]:
+) -> Balances:
     """
-    Returns dict with 'free', 'locked', and 'total' balances for both assets.
-    Structure:
-    {
-        "free":   {BASE: float, QUOTE: float},
-        "locked": {BASE: float, QUOTE: float},
-        "total":  {BASE: float, QUOTE: float}
-    }
+    Returns the free, locked, and total balances for both assets as a Balances.
+    Assets missing from the snapshot read as zero.
     """
 
     def extract(asset):
-        free = snapshot_dict.get(asset, {}).get("free", 0.0)
-        total = snapshot_dict.get(asset, {}).get("total", 0.0)
-        locked = max(0.0, total - free)
-        return free, locked, total
+        snap = snapshot_dict.get(asset) or _EMPTY_BALANCE
+        return snap.get("free", 0.0), snap.get("locked", 0.0), snap.get("total", 0.0)
 
     base_free, base_locked, base_total = extract(base_asset)
     quote_free, quote_locked, quote_total = extract(quote_asset)
 
-    return {
-        "free": {base_asset: base_free, quote_asset: quote_free},
-        "locked": {base_asset: base_locked, quote_asset: quote_locked},
-        "total": {base_asset: base_total, quote_asset: quote_total},
-    }
+    return Balances(
+        base_free, base_locked, base_total, quote_free, quote_locked, quote_total
+    )
 
 
 if __name__ == "__main__":
@@ -110,11 +125,12 @@ if __name__ == "__main__":
         snapshot = {}
         print(f"[{now()}] Starting test WebSocket session for account balance...")
 
-        async with websockets.connect(WS_URL) as ws:
+        async with websockets.connect(WS_URL, compression=None) as ws:
             await send_session_logon(ws)
             print(f"[{now()}] ✅ Authenticated.")
             await ws.send(
-                json.dumps({"method": "userDataStream.subscribe", "id": 10001})
+                orjson.dumps({"method": "userDataStream.subscribe", "id": 10001}),
+                text=True,
             )
             print(f"[{now()}] ✅ Subscribed to userDataStream.")
 
@@ -5,19 +5,23 @@ Fetches historical klines in batch mode via WebSocket session.
 """
 
 import asyncio
-import json
-import time
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
-import matplotlib.pyplot as plt
 import numpy as np
+import orjson
 import websockets
 
+from trailingedge.auth.manager import get_server_timestamp
 from trailingedge.indicators.atr import (
-    compute_atr_from_rows,
+    compute_atr,
     rolling_median,
 )
 from trailingedge.indicators.donchian import compute_donchian_channels
+from trailingedge.indicators.kline_buffer import KlineBuffer
+
+logger = logging.getLogger("trailingedge")
 
 WS_URL = "wss://ws-api.binance.com:443/ws-api/v3"
 
@@ -33,6 +37,26 @@ DONCHIAN_WINDOW = 20
 DONCHIAN_SHIFT = 1
 
 
+# Binance kline intervals in ms whose bars are fixed-length and epoch-aligned
+# ("1w" opens on Mondays and "1M" varies by month, so neither is listed)
+INTERVAL_MS = {
+    "1s": 1_000,
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "3d": 3 * 86_400_000,
+}
+
+
 def now():
     """Return current local time for logs, always in YYYY-MM-DD HH:MM:SS."""
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -66,18 +90,46 @@ def flatten_klines_to_csv(raw_result, flat_csv_file):
         "taker_buy_quote_asset_vol",
         "unused",
     ]
-    all_klines = []
-    for kline in raw_result:
-        k_dict = dict(zip(columns, kline, strict=True))
-        all_klines.append(k_dict)
-    if all_klines:
-        df = pd.DataFrame(all_klines)
+    if raw_result:
+        df = pd.DataFrame(raw_result, columns=columns)
         df.to_csv(flat_csv_file, index=False)
         print(f"[{now()}] Saved {len(df)} klines to {flat_csv_file}")
     else:
         print(f"[{now()}] No klines found to flatten.")
 
 
+async def _send_kline_request(
+    ws,
+    symbol,
+    interval,
+    limit,
+    start_time,
+    end_time,
+    time_zone,
+    request_id="fetch_kline",
+):
+    """Send one klines request without waiting for the response."""
+    params = {
+        "symbol": symbol,
+        "interval": interval,
+        "limit": limit,
+        "timeZone": time_zone,
+    }
+    if start_time is not None:
+        params["startTime"] = int(start_time)
+    if end_time is not None:
+        params["endTime"] = int(end_time)
+
+    payload = {"id": request_id, "method": "klines", "params": params}
+
+    print(
+        f"[{now()}] Fetching {limit} x {interval} klines for {symbol} "
+        f"(start={fmt_utc_minute(start_time)}, end={fmt_utc_minute(end_time)}, TZ={time_zone})"
+    )
+
+    await ws.send(orjson.dumps(payload), text=True)
+
+
 async def fetch_kline_batch(
     ws,
     symbol: str,
@@ -98,27 +150,11 @@ async def fetch_kline_batch(
     :param time_zone: String (default "0" for UTC)
     :return: Full WS response dict
     """
-    params = {
-        "symbol": symbol,
-        "interval": interval,
-        "limit": limit,
-        "timeZone": time_zone,
-    }
-    if start_time is not None:
-        params["startTime"] = int(start_time)
-    if end_time is not None:
-        params["endTime"] = int(end_time)
-
-    payload = {"id": "fetch_kline", "method": "klines", "params": params}
-
-    print(
-        f"[{now()}] Fetching {limit} x {interval} klines for {symbol} "
-        f"(start={fmt_utc_minute(start_time)}, end={fmt_utc_minute(end_time)}, TZ={time_zone})"
+    await _send_kline_request(
+        ws, symbol, interval, limit, start_time, end_time, time_zone
     )
-
-    await ws.send(json.dumps(payload))
     response = await ws.recv()
-    return json.loads(response)
+    return orjson.loads(response)
 
 
 async def fetch_kline_historical_custom_limit(
@@ -126,39 +162,64 @@ async def fetch_kline_historical_custom_limit(
 ):
     """
     Fetches up to total_candles klines via Binance WS-API v3, batching as needed.
+    All batch requests are sent before any response is read, so the whole
+    history costs one round-trip; responses are matched back by request id.
+    Each batch is bounded by its own endTime so a gap in the exchange data
+    cannot make one batch run into the next batch's range.
     Returns: flat list of klines (raw WS API format).
+    Raises: ValueError for an interval without a fixed length (e.g. '1M'),
+    RuntimeError if the WS API answers a batch with an error.
     """
+    step = INTERVAL_MS.get(interval)
+    if step is None:
+        raise ValueError(f"Unsupported kline interval for batching: {interval!r}")
+
+    end_time = get_server_timestamp() // step * step
+    start_time = end_time - total_candles * step
+
+    # Batch boundaries are known up front (1000 klines per request)
+    batches = []
+    batch_start = start_time
+    remaining = total_candles
+    while remaining > 0:
+        limit = min(remaining, 1000)
+        next_start = batch_start + limit * step
+        batch_end = end_time if remaining == limit else next_start - 1
+        batches.append((f"fetch_kline_{len(batches)}", batch_start, batch_end, limit))
+        batch_start = next_start
+        remaining -= limit
+
+    for request_id, batch_start, batch_end, limit in batches:
+        await _send_kline_request(
+            ws,
+            symbol,
+            interval,
+            limit,
+            batch_start,
+            batch_end,
+            time_zone,
+            request_id=request_id,
+        )
 
+    # The WS API may answer out of order; collect by id, then join in order
+    pending = {b[0] for b in batches}
+    results = {}
+    while pending:
+        resp = orjson.loads(await ws.recv())
+        request_id = resp.get("id")
+        if request_id not in pending:
+            logger.debug("Kline fetch: ignoring frame with unmatched id %r", request_id)
+            continue
+        pending.discard(request_id)
+        if "result" not in resp:
+            print(
+                f"[{now()}] [ERROR] Kline batch {request_id} failed: {resp.get('error')}"
+            )
+            raise RuntimeError(f"Kline fetch {request_id} failed: {resp.get('error')}")
+        results[request_id] = resp["result"]
     klines = []
-    fetch_limit = min(total_candles, 1000)
-    end_time = int(time.time() // 60 * 60 * 1000)
-    start_time = end_time - total_candles * 60 * 1000
-
-    # --- First batch
-    resp = await fetch_kline_batch(
-        ws=ws,
-        symbol=symbol,
-        interval=interval,
-        limit=fetch_limit,
-        start_time=start_time,
-        time_zone=time_zone,
-    )
-    klines += resp.get("result", [])
-
-    # --- Additional batch if needed
-    remaining = total_candles - fetch_limit
-    if remaining > 0 and len(klines) > 0:
-        last_close_time = klines[-1][6]  # [6] = close_time in ms
-        resp2 = await fetch_kline_batch(
-            ws=ws,
-            symbol=symbol,
-            interval=interval,
-            limit=remaining,
-            start_time=last_close_time + 1,
-            end_time=end_time,
-            time_zone=time_zone,
-        )
-        klines += resp2.get("result", [])
+    for request_id, *_ in batches:
+        klines += results[request_id]
 
     if len(klines) < total_candles:
         print(
@@ -170,199 +231,258 @@ async def fetch_kline_historical_custom_limit(
     return klines
 
 
-async def main_fetch_atr_dual_channel_chart():
-    async with websockets.connect(WS_URL) as ws:
-        from trailingedge.auth.manager import send_session_logon
+@asynccontextmanager
+async def authed_session(ws=None, purpose="kline fetch"):
+    """
+    Yield an authenticated WS API connection.
+    Reuses `ws` if one is passed in; otherwise opens and logs on a new one,
+    closing it on exit. Lets several chart fetches share one TLS + logon.
+    """
+    if ws is not None:
+        yield ws
+        return
+    from trailingedge.auth.manager import send_session_logon
 
-        await send_session_logon(ws)
-        print(
-            f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Connected and authenticated for ATR chart fetch."
-        )
+    # Small JSON frames: permessage-deflate costs more CPU than it saves
+    async with websockets.connect(WS_URL, compression=None) as new_ws:
+        await send_session_logon(new_ws)
+        print(f"\n[{now()}] Connected and authenticated for {purpose}.")
+        yield new_ws
 
-        klines = await fetch_kline_historical_custom_limit(
-            ws, SYMBOL, interval=INTERVAL, total_candles=TOTAL, time_zone=TIME_ZONE
-        )
-        if not klines or len(klines) < TOTAL:
-            print(
-                f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] WARNING: Only {len(klines)} klines fetched (expected {TOTAL})."
-            )
-            return
 
-        closes = np.array([float(row[4]) for row in klines])
+def render_atr_chart(klines, show=True):
+    """
+    Plot fast/slow ATR, the fast-ATR rolling median and closes.
+    Pure function of the kline rows (no network), so it can be fed canned data.
 
-        # --- ATR calculations ---
-        atr_fast = compute_atr_from_rows(
-            klines, period=ATR_PERIOD_FAST, method="wilder"
-        )
-        atr_slow = compute_atr_from_rows(
-            klines, period=ATR_PERIOD_SLOW, method="wilder"
-        )
+    Args:
+        klines: Historical kline rows (raw WS API format)
+        show: Call plt.show() after drawing (default True)
 
-        # --- Clean ATR arrays (None -> np.nan) ---
-        atr_fast = np.array(
-            [x if x is not None else np.nan for x in atr_fast], dtype=np.float64
-        )
-        atr_slow = np.array(
-            [x if x is not None else np.nan for x in atr_slow], dtype=np.float64
-        )
+    Returns:
+        The matplotlib Figure
+    """
+    import matplotlib.pyplot as plt  # Charting only; keep it off the bot import path
+
+    # Transpose the rows into float64 columns once; both ATRs and the
+    # close plot read the same contiguous arrays
+    cols = KlineBuffer.from_rows(klines)
+    closes = cols.closes
+
+    # --- ATR calculations ---
+    atr_fast = compute_atr(
+        cols,
+        period=ATR_PERIOD_FAST,
+        method="wilder",
+        row_format="soa",
+        return_series=True,
+    )
+    atr_slow = compute_atr(
+        cols,
+        period=ATR_PERIOD_SLOW,
+        method="wilder",
+        row_format="soa",
+        return_series=True,
+    )
 
-        # Rolling median for fast ATR
-        rolling_median_fast = rolling_median(atr_fast, ROLL_WINDOW)
-
-        x = np.arange(len(closes))
-        tick_spacing = 60
-        ticks = np.arange(0, len(x), tick_spacing)
-
-        # --- FAST ATR Plot (plus slow ATR as threshold) ---
-        plt.figure(figsize=(13, 6))
-        ax1 = plt.gca()
-        color_fast = "tab:red"
-        color_slow = "tab:green"
-        color_close = "tab:gray"
-        color_median = "tab:blue"
-
-        # Fast ATR line
-        lns1 = ax1.plot(
-            x,
-            atr_fast,
-            color=color_fast,
-            linestyle="--",
-            linewidth=1.0,
-            alpha=0.5,
-            label=f"Fast ATR (EMA {ATR_PERIOD_FAST})",
-        )
-        # Rolling median (window)
-        l_med = ax1.plot(
-            x,
-            rolling_median_fast,
-            color=color_median,
-            linestyle="--",
-            linewidth=1.0,
-            alpha=0.5,
-            label=f"{ROLL_WINDOW}c Rolling Median (Fast ATR)",
-        )
-        # Slow ATR as dynamic threshold
-        l_slow = ax1.plot(
-            x,
-            atr_slow,
-            color=color_slow,
-            linestyle="--",
-            linewidth=1.0,
-            alpha=0.5,
-            label=f"Slow ATR (Wilder {ATR_PERIOD_SLOW})",
-        )
-        # Kline close on 2nd axis
-        ax2 = ax1.twinx()
-        lns2 = ax2.plot(
-            x, closes, color=color_close, label="Kline Close", linewidth=2.0, alpha=0.7
-        )
+    # --- Clean ATR arrays (None -> np.nan; float64 casting maps None to nan) ---
+    atr_fast = np.asarray(atr_fast, dtype=np.float64)
+    atr_slow = np.asarray(atr_slow, dtype=np.float64)
+
+    # Rolling median for fast ATR
+    rolling_median_fast = rolling_median(atr_fast, ROLL_WINDOW)
+
+    x = np.arange(len(closes))
+    tick_spacing = 60
+    ticks = np.arange(0, len(x), tick_spacing)
+
+    # --- FAST ATR Plot (plus slow ATR as threshold) ---
+    plt.figure(figsize=(13, 6), layout="constrained")
+    ax1 = plt.gca()
+    color_fast = "tab:red"
+    color_slow = "tab:green"
+    color_close = "tab:gray"
+    color_median = "tab:blue"
+
+    # Fast ATR line
+    lns1 = ax1.plot(
+        x,
+        atr_fast,
+        color=color_fast,
+        linestyle="--",
+        linewidth=1.0,
+        alpha=0.5,
+        label=f"Fast ATR (EMA {ATR_PERIOD_FAST})",
+    )
+    # Rolling median (window)
+    l_med = ax1.plot(
+        x,
+        rolling_median_fast,
+        color=color_median,
+        linestyle="--",
+        linewidth=1.0,
+        alpha=0.5,
+        label=f"{ROLL_WINDOW}c Rolling Median (Fast ATR)",
+    )
+    # Slow ATR as dynamic threshold
+    l_slow = ax1.plot(
+        x,
+        atr_slow,
+        color=color_slow,
+        linestyle="--",
+        linewidth=1.0,
+        alpha=0.5,
+        label=f"Slow ATR (Wilder {ATR_PERIOD_SLOW})",
+    )
+    # Kline close on 2nd axis
+    ax2 = ax1.twinx()
+    lns2 = ax2.plot(
+        x, closes, color=color_close, label="Kline Close", linewidth=2.0, alpha=0.7
+    )
 
-        ax1.set_ylabel("ATR Value", color=color_fast)
-        ax2.set_ylabel("Close Price", color=color_close)
-        ax1.set_title(
-            f"{SYMBOL} {INTERVAL} — Fast ATR (EMA {ATR_PERIOD_FAST}) vs Slow ATR (Wilder {ATR_PERIOD_SLOW})"
-        )
-        # Combine all lines for legend
-        lines = lns1 + l_med + l_slow + lns2
-        labels = [
-            f"Fast ATR (EMA {ATR_PERIOD_FAST})",
-            f"{ROLL_WINDOW}c Rolling Median (Fast ATR)",
-            f"Slow ATR (Wilder {ATR_PERIOD_SLOW})",
-            "Kline Close",
-        ]
-        ax1.legend(lines, labels, loc="upper left")
-        ax1.grid(True, alpha=0.2)
-        plt.xlabel("Candle (time increasing →)")
-        ax1.set_xticks(ticks)
-        ax1.set_xticklabels([str(i) for i in ticks], rotation=45, fontsize=8)
-        plt.tight_layout()
+    ax1.set_ylabel("ATR Value", color=color_fast)
+    ax2.set_ylabel("Close Price", color=color_close)
+    ax1.set_title(
+        f"{SYMBOL} {INTERVAL} — Fast ATR (EMA {ATR_PERIOD_FAST}) vs Slow ATR (Wilder {ATR_PERIOD_SLOW})"
+    )
+    # Combine all lines for legend
+    lines = lns1 + l_med + l_slow + lns2
+    labels = [
+        f"Fast ATR (EMA {ATR_PERIOD_FAST})",
+        f"{ROLL_WINDOW}c Rolling Median (Fast ATR)",
+        f"Slow ATR (Wilder {ATR_PERIOD_SLOW})",
+        "Kline Close",
+    ]
+    ax1.legend(lines, labels, loc="upper left")
+    ax1.grid(True, alpha=0.2)
+    plt.xlabel("Candle (time increasing →)")
+    ax1.set_xticks(ticks, labels=ticks.astype(str), rotation=45, fontsize=8)
 
+    if show:
         plt.show()
+    return plt.gcf()
 
 
-async def main_fetch_donchian_channel_chart():
-    async with websockets.connect(WS_URL) as ws:
-        from trailingedge.auth.manager import send_session_logon
-
-        await send_session_logon(ws)
+async def _fetch_chart_klines(ws):
+    """Fetch the chart window (SYMBOL/INTERVAL/TOTAL); None if it came back short."""
+    klines = await fetch_kline_historical_custom_limit(
+        ws, SYMBOL, interval=INTERVAL, total_candles=TOTAL, time_zone=TIME_ZONE
+    )
+    if not klines or len(klines) < TOTAL:
         print(
-            f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Connected and authenticated for Donchian Channel chart fetch."
+            f"[{now()}] WARNING: Only {len(klines)} klines fetched (expected {TOTAL})."
         )
+        return None
+    return klines
 
-        klines = await fetch_kline_historical_custom_limit(
-            ws, SYMBOL, interval=INTERVAL, total_candles=TOTAL, time_zone=TIME_ZONE
-        )
-        if not klines or len(klines) < TOTAL:
-            print(
-                f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] WARNING: Only {len(klines)} klines fetched (expected {TOTAL})."
-            )
-            return
 
-        closes = np.array([float(row[4]) for row in klines])
+async def main_fetch_atr_dual_channel_chart(ws=None):
+    async with authed_session(ws, "ATR chart fetch") as ws:
+        klines = await _fetch_chart_klines(ws)
+    if klines is not None:
+        render_atr_chart(klines)
 
-        # --- Donchian Channel Calculation ---
-        upper, lower, mid = compute_donchian_channels(
-            klines, window=DONCHIAN_WINDOW, shift=DONCHIAN_SHIFT
-        )
 
-        x = np.arange(len(closes))
-        tick_spacing = 60
-        ticks = np.arange(0, len(x), tick_spacing)
-
-        # --- Plot Close + Donchian Channels ---
-        plt.figure(figsize=(13, 6))
-        ax1 = plt.gca()
-        color_upper = "tab:blue"
-        color_lower = "tab:orange"
-        color_mid = "tab:green"
-        color_close = "tab:gray"
-
-        lns1 = ax1.plot(
-            x,
-            upper,
-            color=color_upper,
-            linewidth=1.3,
-            label=f"Donchian Upper ({DONCHIAN_WINDOW})",
-        )
-        lns2 = ax1.plot(
-            x,
-            lower,
-            color=color_lower,
-            linewidth=1.3,
-            label=f"Donchian Lower ({DONCHIAN_WINDOW})",
-        )
-        lns3 = ax1.plot(
-            x,
-            mid,
-            color=color_mid,
-            linewidth=1.0,
-            linestyle="--",
-            alpha=0.6,
-            label="Donchian Mid",
-        )
-        lns4 = ax1.plot(
-            x, closes, color=color_close, linewidth=2.0, alpha=0.7, label="Kline Close"
-        )
+def render_donchian_chart(klines, show=True):
+    """
+    Plot closes with the Donchian upper/lower/mid channels.
+    Pure function of the kline rows (no network), so it can be fed canned data.
 
-        ax1.set_ylabel("Price")
-        ax1.set_title(
-            f"{SYMBOL} {INTERVAL} — Donchian Channel (Window={DONCHIAN_WINDOW})"
-        )
-        lines = lns1 + lns2 + lns3 + lns4
-        labels = [
-            f"Donchian Upper ({DONCHIAN_WINDOW})",
-            f"Donchian Lower ({DONCHIAN_WINDOW})",
-            "Donchian Mid",
-            "Kline Close",
-        ]
-        ax1.legend(lines, labels, loc="upper left")
-        ax1.grid(True, alpha=0.2)
-        plt.xlabel("Candle (time increasing →)")
-        ax1.set_xticks(ticks)
-        ax1.set_xticklabels([str(i) for i in ticks], rotation=45, fontsize=8)
-        plt.tight_layout()
+    Args:
+        klines: Historical kline rows (raw WS API format)
+        show: Call plt.show() after drawing (default True)
+
+    Returns:
+        The matplotlib Figure
+    """
+    import matplotlib.pyplot as plt  # Charting only; keep it off the bot import path
+
+    # Parse the rows once; the close plot and the channels share the columns
+    cols = KlineBuffer.from_rows(klines)
+    closes = cols.closes
+
+    # --- Donchian Channel Calculation ---
+    upper, lower, mid = compute_donchian_channels(
+        cols, window=DONCHIAN_WINDOW, shift=DONCHIAN_SHIFT, row_format="soa"
+    )
+
+    x = np.arange(len(closes))
+    tick_spacing = 60
+    ticks = np.arange(0, len(x), tick_spacing)
+
+    # --- Plot Close + Donchian Channels ---
+    plt.figure(figsize=(13, 6), layout="constrained")
+    ax1 = plt.gca()
+    color_upper = "tab:blue"
+    color_lower = "tab:orange"
+    color_mid = "tab:green"
+    color_close = "tab:gray"
+
+    lns1 = ax1.plot(
+        x,
+        upper,
+        color=color_upper,
+        linewidth=1.3,
+        label=f"Donchian Upper ({DONCHIAN_WINDOW})",
+    )
+    lns2 = ax1.plot(
+        x,
+        lower,
+        color=color_lower,
+        linewidth=1.3,
+        label=f"Donchian Lower ({DONCHIAN_WINDOW})",
+    )
+    lns3 = ax1.plot(
+        x,
+        mid,
+        color=color_mid,
+        linewidth=1.0,
+        linestyle="--",
+        alpha=0.6,
+        label="Donchian Mid",
+    )
+    lns4 = ax1.plot(
+        x, closes, color=color_close, linewidth=2.0, alpha=0.7, label="Kline Close"
+    )
+
+    ax1.set_ylabel("Price")
+    ax1.set_title(f"{SYMBOL} {INTERVAL} — Donchian Channel (Window={DONCHIAN_WINDOW})")
+    lines = lns1 + lns2 + lns3 + lns4
+    labels = [
+        f"Donchian Upper ({DONCHIAN_WINDOW})",
+        f"Donchian Lower ({DONCHIAN_WINDOW})",
+        "Donchian Mid",
+        "Kline Close",
+    ]
+    ax1.legend(lines, labels, loc="upper left")
+    ax1.grid(True, alpha=0.2)
+    plt.xlabel("Candle (time increasing →)")
+    ax1.set_xticks(ticks, labels=ticks.astype(str), rotation=45, fontsize=8)
+
+    if show:
         plt.show()
+    return plt.gcf()
+
+
+async def main_fetch_donchian_channel_chart(ws=None):
+    async with authed_session(ws, "Donchian Channel chart fetch") as ws:
+        klines = await _fetch_chart_klines(ws)
+    if klines is not None:
+        render_donchian_chart(klines)
+
+
+async def main_fetch_all_charts():
+    """
+    Draw the ATR and Donchian charts from one authenticated session.
+    Both charts use the same SYMBOL/INTERVAL/TOTAL window, so it is fetched
+    once; the socket is closed before the (blocking) chart windows open.
+    """
+    async with authed_session(purpose="chart fetch") as ws:
+        klines = await _fetch_chart_klines(ws)
+    if klines is not None:
+        render_atr_chart(klines)
+        render_donchian_chart(klines)
 
 
 if __name__ == "__main__":
-    asyncio.run(main_fetch_donchian_channel_chart())
+    asyncio.run(main_fetch_all_charts())
@@ -6,10 +6,10 @@ shared dictionaries in-place for use in trading algorithms.
 """
 
 import asyncio
-import json
 import time
 from datetime import datetime
 
+import orjson
 import websockets
 
 WS_STREAM_URL = "wss://stream.binance.com:9443/ws"
@@ -23,13 +23,30 @@ def now() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-async def stream_bookticker_shared(symbol: str, snapshot_dict: dict):
+async def _iter_raw_messages(ws):
+    """
+    Yield stream payloads as raw bytes until the server closes cleanly.
+
+    Text frames are not UTF-8 decoded into str: the JSON parser reads bytes
+    directly, so decoding would only add a full pass over every message.
+    """
+    try:
+        while True:
+            yield await ws.recv(decode=False)
+    except websockets.exceptions.ConnectionClosedOK:
+        return
+
+
+async def stream_bookticker_shared(
+    symbol: str, snapshot_dict: dict, updated: asyncio.Event | None = None
+):
     """
     Stream real-time bookTicker data for a symbol, updating a shared snapshot dictionary in place.
     Includes retry logic with exponential backoff for connection failures.
 
     :param symbol: Binance trading symbol, e.g. 'BTCUSDT'
     :param snapshot_dict: Dict to be updated in-place with latest bid/ask/qty/timestamp.
+    :param updated: Optional event set after every snapshot write (wakes readiness waiters)
     """
     stream_name = f"{symbol.lower()}@bookTicker"
     url = f"{WS_STREAM_URL}/{stream_name}"
@@ -39,18 +56,21 @@ async def stream_bookticker_shared(symbol: str, snapshot_dict: dict):
         try:
             print(f"[{now()}] Connecting to Binance stream: {url}")
             async with websockets.connect(
-                url, ping_interval=20, close_timeout=CONNECTION_TIMEOUT
+                url,
+                ping_interval=20,
+                close_timeout=CONNECTION_TIMEOUT,
+                compression=None,
             ) as ws:
                 print(f"[{now()}] Connected to Binance BookTicker stream.")
                 retry_count = 0  # Reset on successful connection
 
-                async for message in ws:
-                    data = json.loads(message)
+                async for message in _iter_raw_messages(ws):
+                    data = orjson.loads(message)
                     bid_price = float(data["b"])
                     bid_qty = float(data["B"])
                     ask_price = float(data["a"])
                     ask_qty = float(data["A"])
-                    ts = int(time.time() * 1000)
+                    ts = time.time_ns() // 1_000_000
                     snapshot_dict.update(
                         {
                             "symbol": symbol.upper(),
@@ -61,6 +81,8 @@ async def stream_bookticker_shared(symbol: str, snapshot_dict: dict):
                             "timestamp": ts,
                         }
                     )
+                    if updated is not None:
+                        updated.set()
         except websockets.exceptions.ConnectionClosedError as e:
             retry_count += 1
             print(
@@ -99,17 +121,26 @@ async def stream_bookticker_shared(symbol: str, snapshot_dict: dict):
 
 
 async def stream_kline_shared(
-    symbol: str, interval: str, kline_dict: dict, use_utc8: bool = False
+    symbol: str,
+    interval: str,
+    kline_dict: dict,
+    use_utc8: bool = False,
+    updated: asyncio.Event | None = None,
+    wake: asyncio.Event | None = None,
 ):
     """
     Stream real-time kline (candlestick) data for a symbol and interval.
     Updates kline_dict in-place with the full 'k' sub-dict from Binance WS.
+    OHLCV fields (o, h, l, c, v) are parsed to float once here; the rest stay as sent.
     Includes retry logic with exponential backoff for connection failures.
 
     :param symbol: Binance trading symbol
     :param interval: Kline interval (e.g., '1m', '5m', '1h')
     :param kline_dict: Dict to be updated in-place with kline data
     :param use_utc8: Whether to use UTC+8 timezone
+    :param updated: Optional event set after every kline write (wakes readiness waiters)
+    :param wake: Optional second event set after every kline write (e.g. one shared
+        with other streams to wake the trading loop)
     """
     if use_utc8:
         stream_name = f"{symbol.lower()}@kline_{interval}@+08:00"
@@ -122,16 +153,31 @@ async def stream_kline_shared(
         try:
             print(f"[{now()}] Connecting to Binance kline stream: {url}")
             async with websockets.connect(
-                url, ping_interval=20, close_timeout=CONNECTION_TIMEOUT
+                url,
+                ping_interval=20,
+                close_timeout=CONNECTION_TIMEOUT,
+                compression=None,
             ) as ws:
                 print(f"[{now()}] Connected to Binance Kline stream.")
                 retry_count = 0  # Reset on successful connection
 
-                async for message in ws:
-                    data = json.loads(message)
-                    k = data.get("k", {})
-                    kline_dict.clear()  # Clean out any old keys
-                    kline_dict.update(k)  # 1:1 update from live payload
+                async for message in _iter_raw_messages(ws):
+                    data = orjson.loads(message)
+                    k = data.get("k")
+                    if not k:
+                        continue  # Not a kline frame; keep the last kline
+                    k["o"] = float(k["o"])
+                    k["h"] = float(k["h"])
+                    k["l"] = float(k["l"])
+                    k["c"] = float(k["c"])
+                    k["v"] = float(k["v"])
+                    # Fixed kline schema: overwriting values in place replaces
+                    # every key, so no clear() is needed first
+                    kline_dict.update(k)
+                    if updated is not None:
+                        updated.set()
+                    if wake is not None:
+                        wake.set()
         except websockets.exceptions.ConnectionClosedError as e:
             retry_count += 1
             print(
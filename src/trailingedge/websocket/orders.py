@@ -4,11 +4,18 @@ Binance Spot order placement utilities via WebSocket API.
 Handles limit, market, OCO orders and mass-cancel operations.
 """
 
-import json
-import uuid
+import itertools
+import os
+
+import orjson
 
 from trailingedge.auth.manager import get_server_timestamp
 
+# WS API request ids only correlate responses; a per-process counter is unique
+# enough and skips the urandom read behind uuid4()
+_OCO_IDS = itertools.count(1)
+_PID = os.getpid()
+
 
 async def place_limit_order(ws, symbol, side, price, qty):
     """Place a limit order."""
@@ -25,7 +32,7 @@ async def place_limit_order(ws, symbol, side, price, qty):
             "timestamp": get_server_timestamp(),
         },
     }
-    await ws.send(json.dumps(payload))
+    await ws.send(orjson.dumps(payload), text=True)
 
 
 async def place_market_order(ws, symbol, side, qty):
@@ -41,7 +48,7 @@ async def place_market_order(ws, symbol, side, qty):
             "timestamp": get_server_timestamp(),
         },
     }
-    await ws.send(json.dumps(payload))
+    await ws.send(orjson.dumps(payload), text=True)
 
 
 async def cancel_all_orders(ws, symbol="BTCFDUSD"):
@@ -51,7 +58,7 @@ async def cancel_all_orders(ws, symbol="BTCFDUSD"):
         "method": "openOrders.cancelAll",
         "params": {"symbol": symbol, "timestamp": get_server_timestamp()},
     }
-    await ws.send(json.dumps(payload))
+    await ws.send(orjson.dumps(payload), text=True)
 
 
 async def place_oco_order(ws, symbol, side, quantity, limit_price, stop_price):
@@ -61,7 +68,7 @@ async def place_oco_order(ws, symbol, side, quantity, limit_price, stop_price):
         - STOP_LOSS at stop_price (fallback, market order)
     """
     payload = {
-        "id": str(uuid.uuid4()),
+        "id": f"oco-{_PID}-{next(_OCO_IDS)}",
         "method": "orderList.place.oco",
         "params": {
             "symbol": symbol,
@@ -75,7 +82,7 @@ async def place_oco_order(ws, symbol, side, quantity, limit_price, stop_price):
             "timestamp": get_server_timestamp(),
         },
     }
-    await ws.send(json.dumps(payload))
+    await ws.send(orjson.dumps(payload), text=True)
 
 
 async def order_replace(ws, symbol, side, price, qty, clientOrderId, origClientOrderId):
@@ -98,4 +105,4 @@ async def order_replace(ws, symbol, side, price, qty, clientOrderId, origClientO
             "timestamp": get_server_timestamp(),
         },
     }
-    await ws.send(json.dumps(payload))
+    await ws.send(orjson.dumps(payload), text=True)
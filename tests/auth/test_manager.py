@@ -2,7 +2,12 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from trailingedge.auth.manager import build_session_logon_request, sign_ed25519_message
+from trailingedge.auth.manager import (
+    _get_private_key,
+    build_session_logon_request,
+    get_server_timestamp,
+    sign_ed25519_message,
+)
 
 
 # Mock the private key loading so we don't need a real key file
@@ -13,7 +18,10 @@ def mock_private_key():
         mock_key = MagicMock()
         mock_key.sign.return_value = b"fake_signature_bytes"
         mock_load.return_value = mock_key
+        # The parsed key is cached; clear it so each test sees its own mock
+        _get_private_key.cache_clear()
         yield mock_load
+        _get_private_key.cache_clear()
 
 
 def test_sign_ed25519_message(mock_private_key):
@@ -35,3 +43,21 @@ def test_build_session_logon_request(mock_private_key):
             assert request["params"]["apiKey"] == "test_api_key"
             assert request["params"]["timestamp"] == 1234567890
             assert "signature" in request["params"]
+            mock_private_key.return_value.sign.assert_called_once_with(
+                b"apiKey=test_api_key&timestamp=1234567890"
+            )
+
+
+def test_private_key_loaded_once(mock_private_key):
+    """Test that repeated signing reuses the cached private key."""
+    sign_ed25519_message("first")
+    sign_ed25519_message("second")
+    assert mock_private_key.call_count == 1
+
+
+def test_get_server_timestamp_truncates_to_ms():
+    """Test that the timestamp is integer milliseconds without float rounding."""
+    with patch(
+        "trailingedge.auth.manager.time.time_ns", return_value=1_700_000_000_999_999_999
+    ):
+        assert get_server_timestamp() == 1_700_000_000_999
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from trailingedge.indicators.atr import ATRState, compute_atr
+from trailingedge.indicators.kline_buffer import KlineBuffer
+
+
+def _klines(n, seed=7):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, n))
+    return [
+        {"h": str(c + rng.uniform(0, 2)), "l": str(c - rng.uniform(0, 2)), "c": str(c)}
+        for c in closes
+    ]
+
+
+@pytest.mark.parametrize("method", ["wilder", "ema", "sma"])
+def test_atr_state_matches_batch(method):
+    """Test incremental ATR matches compute_atr after every bar."""
+    klines = _klines(30)
+    state = ATRState(period=5, method=method)
+
+    for i, k in enumerate(klines):
+        value = state.update(k["h"], k["l"], k["c"])
+        expected = compute_atr(klines[: i + 1], period=5, method=method)
+        if expected is None:
+            assert value is None
+        else:
+            assert np.isclose(value, expected)
+
+
+def test_atr_state_warmup_from_rows():
+    """Test warmup from historical rows then continuing with live bars."""
+    klines = _klines(25)
+    rows = [[0, "0", k["h"], k["l"], k["c"]] for k in klines]
+    state = ATRState(period=5, klines=rows[:20], row_format="row")
+
+    for k in klines[20:]:
+        state.update(k["h"], k["l"], k["c"])
+
+    assert np.isclose(state.value, compute_atr(klines, period=5))
+
+
+def test_atr_state_warmup_from_arrays():
+    """Test warmup accepts a 2D numpy array and KlineBuffer columns."""
+    klines = _klines(20)
+    rows = [
+        [i, k["c"], k["h"], k["l"], k["c"], "0", i + 59_999]
+        for i, k in enumerate(klines)
+    ]
+    expected = compute_atr(klines, period=5)
+
+    from_array = ATRState(period=5, klines=np.array(rows), row_format="row")
+    from_buffer = ATRState(
+        period=5, klines=KlineBuffer.from_rows(rows), row_format="soa"
+    )
+
+    assert np.isclose(from_array.value, expected)
+    assert np.isclose(from_buffer.value, expected)
+    assert ATRState(period=5, klines=np.empty((0, 5)), row_format="row").value is None
+
+
+def test_atr_state_invalid_method():
+    """Test unknown smoothing methods are rejected."""
+    with pytest.raises(ValueError, match="method must be"):
+        ATRState(method="hull")
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from trailingedge.indicators.donchian import DonchianState, compute_donchian_channels
+
+
+def _batch_last(closes, window, shift):
+    klines = [{"c": str(c)} for c in closes]
+    upper, lower, mid = compute_donchian_channels(klines, window=window, shift=shift)
+    return upper[-1], lower[-1], mid[-1]
+
+
+@pytest.mark.parametrize(("window", "shift"), [(3, 0), (3, 1), (5, 2), (1, 1)])
+def test_donchian_state_matches_batch(window, shift):
+    """Test incremental updates match the batch computation at every bar."""
+    rng = np.random.default_rng(42)
+    closes = list(np.round(rng.uniform(90, 110, 40), 2))
+    state = DonchianState(window=window, shift=shift)
+
+    for i, close in enumerate(closes):
+        result = state.update(close)
+        expected = _batch_last(closes[: i + 1], window, shift)
+        assert np.allclose(result, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("shift", [0, 2])
+def test_donchian_state_amend_forming_bar(shift):
+    """Test amending the newest bar matches a batch run on the revised closes."""
+    closes = [10.0, 30.0, 20.0, 25.0, 15.0]
+    state = DonchianState(window=3, shift=shift, closes=closes)
+
+    # Forming bar ticks up then drops well below the previous minimum
+    for revised in (40.0, 1.0):
+        closes[-1] = revised
+        result = state.amend(revised)
+        assert np.allclose(result, _batch_last(closes, 3, shift), equal_nan=True)
+
+
+def test_donchian_state_empty_window():
+    """Test channels are NaN until a bar has shifted into the window."""
+    state = DonchianState(window=3, shift=1)
+
+    assert all(np.isnan(v) for v in state.update(10.0))
+    assert state.update(20.0) == (10.0, 10.0, 10.0)
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from trailingedge.indicators.atr import compute_atr
+from trailingedge.indicators.donchian import compute_donchian_channels
+from trailingedge.indicators.kline_buffer import KlineBuffer
+
+
+def _kline(i, close):
+    return {
+        "t": i * 60_000,
+        "T": i * 60_000 + 59_999,
+        "o": str(close - 1),
+        "h": str(close + 2),
+        "l": str(close - 2),
+        "c": str(close),
+        "v": "1.5",
+    }
+
+
+def test_kline_buffer_rolls_past_capacity():
+    """Test the window keeps the newest maxlen klines in time order."""
+    buf = KlineBuffer(maxlen=3)
+    for i in range(10):  # Forces several compactions of the backing arrays
+        buf.append(_kline(i, 100 + i))
+
+    assert len(buf) == 3
+    assert list(buf.closes) == [107.0, 108.0, 109.0]
+    assert list(buf.open_times) == [420_000, 480_000, 540_000]
+    assert buf.last_close_time == 9 * 60_000 + 59_999
+
+
+def test_kline_buffer_update_last():
+    """Test the forming kline is overwritten in place."""
+    buf = KlineBuffer(maxlen=3)
+    buf.append(_kline(0, 100))
+    buf.append(_kline(1, 101))
+    buf.update_last(_kline(1, 95))
+
+    assert list(buf.closes) == [100.0, 95.0]
+    assert list(buf.lows) == [98.0, 93.0]
+
+
+def test_kline_buffer_extend_rows_matches_append():
+    """Test bulk-loading REST rows gives the same columns as appending dicts."""
+    klines = [_kline(i, 100 + i) for i in range(5)]
+    rows = [
+        [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], "0", 1, "0", "0", "0"]
+        for k in klines
+    ]
+    appended = KlineBuffer(maxlen=3)
+    for k in klines:
+        appended.append(k)
+    loaded = KlineBuffer(maxlen=3)
+    loaded.extend_rows(rows[:2])
+    loaded.extend_rows(rows[2:])  # Keeps the newest 3 across both calls
+
+    for col in ("open_times", "close_times", "opens", "highs", "lows", "closes"):
+        np.testing.assert_array_equal(getattr(loaded, col), getattr(appended, col))
+    loaded.append(_kline(5, 105))
+    assert list(loaded.closes) == [103.0, 104.0, 105.0]
+
+
+def test_kline_buffer_from_rows_feeds_indicators():
+    """Test one from_rows() parse serves ATR and Donchian like the raw rows do."""
+    klines = [_kline(i, c) for i, c in enumerate([10, 30, 20, 5, 25, 40, 15])]
+    rows = [
+        [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], "0", 1, "0", "0", "0"]
+        for k in klines
+    ]
+    buf = KlineBuffer.from_rows(rows)
+
+    assert len(buf) == len(rows)
+    assert buf.maxlen == len(rows)
+    for a, b in zip(
+        compute_donchian_channels(rows, window=3, shift=1, row_format="row"),
+        compute_donchian_channels(buf, window=3, shift=1, row_format="soa"),
+        strict=True,
+    ):
+        assert np.array_equal(a, b, equal_nan=True)
+    assert np.isclose(
+        compute_atr(rows, period=3, row_format="row"),
+        compute_atr(buf, period=3, row_format="soa"),
+    )
+    assert len(KlineBuffer.from_rows(rows, maxlen=3)) == 3
+
+
+def test_kline_buffer_update_last_empty():
+    """Test updating an empty buffer is rejected."""
+    with pytest.raises(IndexError):
+        KlineBuffer(maxlen=3).update_last(_kline(0, 100))
+
+
+def test_indicators_accept_soa_buffer():
+    """Test 'soa' inputs give the same results as the dict klines they hold."""
+    klines = [_kline(i, c) for i, c in enumerate([10, 30, 20, 5, 25, 40, 15])]
+    buf = KlineBuffer(maxlen=len(klines))
+    for k in klines:
+        buf.append(k)
+
+    for a, b in zip(
+        compute_donchian_channels(klines, window=3, shift=1),
+        compute_donchian_channels(buf, window=3, shift=1, row_format="soa"),
+        strict=True,
+    ):
+        assert np.array_equal(a, b, equal_nan=True)
+    assert np.isclose(
+        compute_atr(klines, period=3),
+        compute_atr(buf, period=3, row_format="soa"),
+    )
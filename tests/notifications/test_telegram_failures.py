@@ -2,138 +2,245 @@
 Integration tests for Telegram notification failure handling.
 """
 
+import asyncio
 from unittest.mock import MagicMock, patch
 
+import pytest
 import requests
 
+from trailingedge.notifications.telegram import (
+    broadcast_telegram_message,
+    broadcast_telegram_message_async,
+    send_telegram_message,
+)
 
-def test_telegram_missing_bot_token():
-    """Test that send_telegram_message fails gracefully when bot token is missing."""
-    from trailingedge.notifications.telegram import send_telegram_message
 
-    with patch("trailingedge.notifications.telegram.TELEGRAM_BOT_TOKEN", None):
-        result = send_telegram_message("Test message")
-        assert result is False
+@pytest.fixture
+def telegram_env():
+    """Configure bot token, personal chat and both group chats in one patch."""
+    with patch.multiple(
+        "trailingedge.notifications.telegram",
+        TELEGRAM_BOT_TOKEN="test_token",
+        TELEGRAM_CHAT_ID="12345",
+        TELEGRAM_GROUP_CHAT_ID_1="chat1",
+        TELEGRAM_GROUP_CHAT_ID_2="chat2",
+    ):
+        yield
 
 
-def test_telegram_missing_chat_id():
-    """Test that send_telegram_message fails gracefully when chat ID is missing."""
-    from trailingedge.notifications.telegram import send_telegram_message
+def _post(**kwargs):
+    """Patch the pooled session's post with the given mock behaviour."""
+    return patch("trailingedge.notifications.telegram._TG_SESSION.post", **kwargs)
 
-    with patch("trailingedge.notifications.telegram.TELEGRAM_BOT_TOKEN", "test_token"):
-        with patch("trailingedge.notifications.telegram.TELEGRAM_CHAT_ID", None):
-            result = send_telegram_message("Test message")
-            assert result is False
 
+def test_telegram_missing_bot_token(telegram_env):
+    """Test that send_telegram_message fails gracefully when bot token is missing."""
+    with patch("trailingedge.notifications.telegram.TELEGRAM_BOT_TOKEN", None):
+        assert send_telegram_message("Test message") is False
 
-def test_telegram_network_timeout():
-    """Test that send_telegram_message handles network timeouts."""
-    from trailingedge.notifications.telegram import send_telegram_message
 
-    def mock_post_timeout(*args, **kwargs):
-        raise requests.exceptions.Timeout("Connection timed out")
+def test_telegram_missing_chat_id(telegram_env):
+    """Test that send_telegram_message fails gracefully when chat ID is missing."""
+    with patch("trailingedge.notifications.telegram.TELEGRAM_CHAT_ID", None):
+        assert send_telegram_message("Test message") is False
 
-    with patch("trailingedge.notifications.telegram.TELEGRAM_BOT_TOKEN", "test_token"):
-        with patch("trailingedge.notifications.telegram.TELEGRAM_CHAT_ID", "12345"):
-            with patch(
-                "trailingedge.notifications.telegram.requests.post",
-                side_effect=mock_post_timeout,
-            ):
-                result = send_telegram_message("Test message")
-                assert result is False
 
+def test_telegram_network_timeout(telegram_env):
+    """Test that send_telegram_message handles network timeouts."""
+    with _post(side_effect=requests.exceptions.Timeout("Connection timed out")):
+        assert send_telegram_message("Test message") is False
 
-def test_telegram_http_error():
-    """Test that send_telegram_message handles HTTP errors (non-200 status)."""
-    from trailingedge.notifications.telegram import send_telegram_message
 
+def test_telegram_http_error(telegram_env):
+    """Test that send_telegram_message handles HTTP errors (non-200 status)."""
     mock_response = MagicMock()
     mock_response.status_code = 400
     mock_response.text = "Bad Request"
 
-    with patch("trailingedge.notifications.telegram.TELEGRAM_BOT_TOKEN", "test_token"):
-        with patch("trailingedge.notifications.telegram.TELEGRAM_CHAT_ID", "12345"):
-            with patch(
-                "trailingedge.notifications.telegram.requests.post",
-                return_value=mock_response,
-            ):
-                result = send_telegram_message("Test message")
-                assert result is False
+    with _post(return_value=mock_response):
+        assert send_telegram_message("Test message") is False
 
 
-def test_telegram_success():
+def test_telegram_success(telegram_env):
     """Test that send_telegram_message succeeds with valid credentials."""
-    from trailingedge.notifications.telegram import send_telegram_message
-
     mock_response = MagicMock()
     mock_response.status_code = 200
 
-    with patch("trailingedge.notifications.telegram.TELEGRAM_BOT_TOKEN", "test_token"):
-        with patch("trailingedge.notifications.telegram.TELEGRAM_CHAT_ID", "12345"):
-            with patch(
-                "trailingedge.notifications.telegram.requests.post",
-                return_value=mock_response,
-            ):
-                result = send_telegram_message("Test message")
-                assert result is True
+    with _post(return_value=mock_response):
+        assert send_telegram_message("Test message") is True
 
 
-def test_broadcast_to_multiple_recipients():
+def test_broadcast_to_multiple_recipients(telegram_env):
     """Test that broadcast_telegram_message sends to multiple recipients."""
-    from trailingedge.notifications.telegram import broadcast_telegram_message
-
     mock_response = MagicMock()
     mock_response.status_code = 200
 
-    call_count = []
-
-    def mock_post(*args, **kwargs):
-        call_count.append(1)
-        return mock_response
-
-    with patch("trailingedge.notifications.telegram.TELEGRAM_BOT_TOKEN", "test_token"):
-        with patch(
-            "trailingedge.notifications.telegram.TELEGRAM_GROUP_CHAT_ID_1", "chat1"
-        ):
-            with patch(
-                "trailingedge.notifications.telegram.TELEGRAM_GROUP_CHAT_ID_2", "chat2"
-            ):
-                with patch(
-                    "trailingedge.notifications.telegram.requests.post",
-                    side_effect=mock_post,
-                ):
-                    result = broadcast_telegram_message("Test broadcast")
-                    # Should send to 2 recipients
-                    assert result == 2
-                    assert len(call_count) == 2
-
-
-def test_broadcast_partial_failure():
-    """Test that broadcast continues even if one recipient fails."""
-    from trailingedge.notifications.telegram import broadcast_telegram_message
+    with _post(return_value=mock_response) as mock_post:
+        result = broadcast_telegram_message("Test broadcast")
+
+    # Should send to 2 recipients
+    assert result == 2
+    assert mock_post.call_count == 2
 
+
+def test_broadcast_partial_failure(telegram_env):
+    """Test that broadcast continues even if one recipient fails."""
     mock_success = MagicMock()
     mock_success.status_code = 200
 
     mock_failure = MagicMock()
     mock_failure.status_code = 400
 
-    responses = [mock_failure, mock_success]
-
-    def mock_post(*args, **kwargs):
-        return responses.pop(0)
-
-    with patch("trailingedge.notifications.telegram.TELEGRAM_BOT_TOKEN", "test_token"):
-        with patch(
-            "trailingedge.notifications.telegram.TELEGRAM_GROUP_CHAT_ID_1", "chat1"
-        ):
-            with patch(
-                "trailingedge.notifications.telegram.TELEGRAM_GROUP_CHAT_ID_2", "chat2"
-            ):
-                with patch(
-                    "trailingedge.notifications.telegram.requests.post",
-                    side_effect=mock_post,
-                ):
-                    result = broadcast_telegram_message("Test broadcast")
-                    # Should succeed for 1 out of 2
-                    assert result == 1
+    with _post(side_effect=[mock_failure, mock_success]):
+        result = broadcast_telegram_message("Test broadcast")
+
+    # Should succeed for 1 out of 2
+    assert result == 1
+
+
+async def test_broadcast_async_sends_concurrently(telegram_env):
+    """Test the async broadcast delivers to every recipient off the event loop."""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+
+    with _post(return_value=mock_response) as mock_post:
+        result = await broadcast_telegram_message_async(
+            "Test broadcast", chat_id_list=["chat1", "chat2", None]
+        )
+
+    assert result == 2
+    assert mock_post.call_count == 2
+
+
+async def test_telegram_worker_batches_queued_alerts():
+    """Test alerts queued together go out as one joined broadcast."""
+    from trailingedge.notifications import telegram
+
+    sent: asyncio.Queue[str] = asyncio.Queue()
+
+    async def fake_broadcast(message, chat_id_list=None):
+        sent.put_nowait(message)
+        return 1
+
+    with (
+        patch.object(telegram, "broadcast_telegram_message_async", fake_broadcast),
+        patch.object(telegram, "_queue", asyncio.Queue()),
+    ):
+        # Queued before the worker starts: carried over into the worker's queue
+        telegram.enqueue_telegram_message("flip 1")
+        telegram.enqueue_telegram_message("flip 2")
+        worker = asyncio.create_task(telegram.telegram_worker())
+        first = await asyncio.wait_for(sent.get(), timeout=1)
+        worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await worker
+
+    assert first == "flip 1\n---\nflip 2"
+    assert sent.empty()
+
+
+async def test_telegram_worker_debounces_rapid_alerts():
+    """Test alerts inside the debounce window are held and merged."""
+    from trailingedge.notifications import telegram
+
+    sent: asyncio.Queue[str] = asyncio.Queue()
+    debounce_waits = []
+    sleeping = asyncio.Event()
+    release = asyncio.Event()
+
+    async def fake_broadcast(message, chat_id_list=None):
+        sent.put_nowait(message)
+        return 1
+
+    async def fake_sleep(delay):
+        # Hold the worker in its debounce window until the test releases it
+        debounce_waits.append(delay)
+        sleeping.set()
+        await release.wait()
+
+    with (
+        patch.object(telegram, "broadcast_telegram_message_async", fake_broadcast),
+        patch.object(telegram, "_queue", asyncio.Queue()),
+        patch("trailingedge.notifications.telegram.asyncio.sleep", fake_sleep),
+    ):
+        worker = asyncio.create_task(telegram.telegram_worker())
+        telegram.enqueue_telegram_message("flip 1")
+        assert await asyncio.wait_for(sent.get(), timeout=1) == "flip 1"
+
+        # Right after a send: the next alert waits out the interval...
+        telegram.enqueue_telegram_message("flip 2")
+        await asyncio.wait_for(sleeping.wait(), timeout=1)
+        assert sent.empty()
+        assert 0 < debounce_waits[0] <= telegram.TELEGRAM_MIN_SEND_INTERVAL_SEC
+
+        # ...and anything arriving meanwhile is merged into the same batch
+        telegram.enqueue_telegram_message("flip 3")
+        release.set()
+        second = await asyncio.wait_for(sent.get(), timeout=1)
+        worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await worker
+
+    assert second == "flip 2\n---\nflip 3"
+    assert len(debounce_waits) == 1
+    assert sent.empty()
+
+
+async def test_flush_waits_for_queued_alerts_to_send():
+    """Test shutdown flush returns once the worker has sent every queued alert."""
+    from trailingedge.notifications import telegram
+
+    sent = []
+
+    async def fake_broadcast(message, chat_id_list=None):
+        sent.append(message)
+        return 1
+
+    with (
+        patch.object(telegram, "broadcast_telegram_message_async", fake_broadcast),
+        patch.object(telegram, "_queue", asyncio.Queue()),
+    ):
+        worker = asyncio.create_task(telegram.telegram_worker())
+        telegram.enqueue_telegram_message("stop hit")
+        telegram.enqueue_telegram_message("bye")
+        assert await telegram.flush_telegram_queue(timeout=1) is True
+        worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await worker
+
+    assert sent == ["stop hit\n---\nbye"]
+
+
+async def test_flush_gives_up_after_timeout():
+    """Test flush is bounded when nothing drains the queue."""
+    from trailingedge.notifications import telegram
+
+    with patch.object(telegram, "_queue", asyncio.Queue()):
+        telegram.enqueue_telegram_message("never sent")
+        assert await telegram.flush_telegram_queue(timeout=0.01) is False
+
+
+def test_alert_queue_is_created_lazily():
+    """Test the alert queue is not built at import time, only on first use."""
+    from trailingedge.notifications import telegram
+
+    with patch.object(telegram, "_queue", None):
+        telegram.enqueue_telegram_message("hello")
+        assert telegram._queue.maxsize == telegram.TELEGRAM_QUEUE_MAXSIZE
+        assert telegram._queue.get_nowait() == "hello"
+
+
+def test_enqueue_drops_oldest_when_full():
+    """Test a full alert queue drops its oldest message instead of blocking."""
+    from trailingedge.notifications import telegram
+
+    with patch.object(telegram, "_queue", asyncio.Queue(maxsize=2)):
+        for msg in ("a", "b", "c"):
+            telegram.enqueue_telegram_message(msg)
+        assert telegram._queue.get_nowait() == "b"
+        assert telegram._queue.get_nowait() == "c"
+        # The dropped alert is already accounted for in join()
+        telegram._queue.task_done()
+        telegram._queue.task_done()
+        with pytest.raises(ValueError, match="task_done"):
+            telegram._queue.task_done()
@@ -1,22 +1,31 @@
 # Mock config constants used in detect_regime
 # We need to patch them because they are imported into main.py
-from unittest.mock import patch
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from trailingedge.main import clip, detect_regime
+from trailingedge import main
+from trailingedge.main import (
+    TrailingState,
+    _fast_clip,
+    clip,
+    detect_regime,
+    fmt_bal,
+    install_hotkey_listener,
+    wait_for_account_snapshot,
+    wait_for_market_snapshot,
+    wait_for_next_tick,
+)
 
 
 @pytest.fixture
-def mock_config():
-    with (
-        patch("trailingedge.main.MIN_QTY", 0.0001),
-        patch("trailingedge.main.MIN_NOTIONAL", 5.0),
-        patch("trailingedge.main.LOT_SIZE", 0.0001),
-        patch("trailingedge.main.BASE_ASSET", "ETH"),
-        patch("trailingedge.main.QUOTE_ASSET", "FDUSD"),
-    ):
-        yield
+def mock_config(monkeypatch):
+    monkeypatch.setattr(main, "MIN_QTY", 0.0001)
+    monkeypatch.setattr(main, "MIN_NOTIONAL", 5.0)
+    monkeypatch.setattr(main, "LOT_SIZE", 0.0001)
 
 
 def test_clip():
@@ -27,26 +36,112 @@ def test_clip():
     assert clip(None, 1) == 0.0
 
 
+def test_fast_clip_matches_clip():
+    """Test the hot-path clip agrees with clip() for positive inputs."""
+    for value, step in [(1.23456, 0.01), (1.23999, 0.01), (105, 10), (0.0, 0.0001)]:
+        assert _fast_clip(value, step) == clip(value, step)
+
+
+def test_fmt_bal():
+    """Test balance formatting for alerts, including assets not in the snapshot."""
+    snapshot = {"ETH": {"free": 1.5, "locked": 0.25, "total": 1.75}}
+    assert fmt_bal(snapshot, "ETH") == (
+        "ETH\n  Free:   1.50000000\n  Locked: 0.25000000"
+    )
+    assert fmt_bal(snapshot, "FDUSD").endswith("Locked: 0.00000000")
+
+
 def test_detect_regime_base(mock_config):
     """Test detection of BASE regime (holding ETH)."""
     # 1.0 ETH, 0 FDUSD. Price 3000.
     # Notional = 3000 > 5.0 (MIN_NOTIONAL)
-    balances = {"ETH": 1.0, "FDUSD": 0.0}
-    regime = detect_regime(balances, bid=3000.0, ask=3001.0)
+    regime = detect_regime(1.0, 0.0, bid=3000.0, ask=3001.0)
     assert regime == "BASE"
 
 
 def test_detect_regime_quote(mock_config):
     """Test detection of QUOTE regime (holding FDUSD)."""
     # 0 ETH, 3000 FDUSD.
-    balances = {"ETH": 0.0, "FDUSD": 3000.0}
-    regime = detect_regime(balances, bid=3000.0, ask=3001.0)
+    regime = detect_regime(0.0, 3000.0, bid=3000.0, ask=3001.0)
     assert regime == "QUOTE"
 
 
 def test_detect_regime_none(mock_config):
     """Test detection of insufficient funds (None regime)."""
     # 0.00001 ETH (too small), 1.0 FDUSD (too small)
-    balances = {"ETH": 0.00001, "FDUSD": 1.0}
-    regime = detect_regime(balances, bid=3000.0, ask=3001.0)
+    regime = detect_regime(0.00001, 1.0, bid=3000.0, ask=3001.0)
     assert regime is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="add_reader needs POSIX stdin")
+async def test_hotkey_listener_arms_exit_from_event_loop():
+    """Test the hotkey is read by the event loop and arms the maker exit."""
+    read_fd, write_fd = os.pipe()
+    fake_stdin = MagicMock()
+    fake_stdin.isatty.return_value = True
+    fake_stdin.fileno.return_value = read_fd
+    state = TrailingState()
+    try:
+        with patch("trailingedge.main.sys.stdin", fake_stdin):
+            install_hotkey_listener(state, hotkey="x")
+        os.write(write_fd, b"y\n")
+        await asyncio.sleep(0.05)
+        assert not state.manual_exit_triggered
+
+        os.write(write_fd, b"X\n")
+        await asyncio.sleep(0.05)
+        assert state.manual_exit_triggered
+    finally:
+        asyncio.get_running_loop().remove_reader(read_fd)
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+async def test_wait_for_market_snapshot_wakes_on_update():
+    """Test the waiter returns once the producer writes the required keys."""
+    snapshot = {}
+    updated = asyncio.Event()
+
+    async def producer():
+        await asyncio.sleep(0.01)
+        snapshot["bid_price"] = 100.0  # Partial write: waiter must keep waiting
+        updated.set()
+        await asyncio.sleep(0.01)
+        snapshot["ask_price"] = 101.0
+        updated.set()
+
+    task = asyncio.create_task(producer())
+    await wait_for_market_snapshot(
+        snapshot, ["bid_price", "ask_price"], updated, label="Test", timeout=1
+    )
+    await task
+    assert snapshot["ask_price"] == 101.0
+
+
+async def test_wait_for_next_tick_wakes_early_or_at_deadline():
+    """Test the tick wait ends on an update or at the deadline, never later."""
+    loop = asyncio.get_running_loop()
+    updated = asyncio.Event()
+
+    # Update already pending: returns at once and clears it for the next tick
+    updated.set()
+    await asyncio.wait_for(wait_for_next_tick(updated, loop.time() + 60), timeout=1)
+    assert not updated.is_set()
+
+    # Quiet market: returns at the deadline instead of waiting for an update
+    await asyncio.wait_for(wait_for_next_tick(updated, loop.time() + 0.01), timeout=1)
+
+    # Deadline already passed (slow tick): no extra wait at all
+    await asyncio.wait_for(wait_for_next_tick(updated, loop.time() - 5), timeout=1)
+
+
+async def test_wait_for_account_snapshot_times_out():
+    """Test the waiter raises TimeoutError when balances never arrive."""
+    with pytest.raises(TimeoutError):
+        await wait_for_account_snapshot(
+            {"BTC": {"free": 1.0}},
+            [("BTC", "free"), ("BTC", "total")],
+            asyncio.Event(),
+            label="Test",
+            timeout=0.05,
+        )
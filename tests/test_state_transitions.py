@@ -2,65 +2,38 @@
 Integration tests for trading state transitions and regime changes.
 """
 
-from unittest.mock import patch
-
 import pytest
 
+from trailingedge import main
 from trailingedge.main import TrailingState, detect_regime
 
 
 @pytest.fixture
-def mock_config():
-    """Mock configuration constants."""
-    with (
-        patch("trailingedge.main.MIN_QTY", 0.0001),
-        patch("trailingedge.main.MIN_NOTIONAL", 5.0),
-        patch("trailingedge.main.LOT_SIZE", 0.0001),
-        patch("trailingedge.main.BASE_ASSET", "ETH"),
-        patch("trailingedge.main.QUOTE_ASSET", "FDUSD"),
-    ):
-        yield
-
-
-def test_regime_transition_base_to_quote(mock_config):
-    """Test transition from BASE to QUOTE regime."""
-    # Start in BASE regime (holding ETH)
-    balances_base = {"ETH": 1.0, "FDUSD": 0.0}
-    regime = detect_regime(balances_base, bid=3000.0, ask=3001.0)
-    assert regime == "BASE"
-
-    # Transition to QUOTE regime (now holding FDUSD)
-    balances_quote = {"ETH": 0.0, "FDUSD": 3000.0}
-    regime = detect_regime(balances_quote, bid=3000.0, ask=3001.0)
-    assert regime == "QUOTE"
-
-
-def test_regime_transition_quote_to_base(mock_config):
-    """Test transition from QUOTE to BASE regime."""
-    # Start in QUOTE regime
-    balances_quote = {"ETH": 0.0, "FDUSD": 3000.0}
-    regime = detect_regime(balances_quote, bid=3000.0, ask=3001.0)
-    assert regime == "QUOTE"
-
-    # Transition to BASE regime
-    balances_base = {"ETH": 1.0, "FDUSD": 0.0}
-    regime = detect_regime(balances_base, bid=3000.0, ask=3001.0)
-    assert regime == "BASE"
-
-
-def test_regime_transition_full_cycle(mock_config):
-    """Test complete cycle: BASE → QUOTE → BASE."""
-    # Start BASE
-    bal1 = {"ETH": 1.0, "FDUSD": 0.0}
-    assert detect_regime(bal1, 3000.0, 3001.0) == "BASE"
-
-    # → QUOTE
-    bal2 = {"ETH": 0.0, "FDUSD": 3000.0}
-    assert detect_regime(bal2, 3000.0, 3001.0) == "QUOTE"
-
-    # → BASE again
-    bal3 = {"ETH": 1.0, "FDUSD": 0.0}
-    assert detect_regime(bal3, 3000.0, 3001.0) == "BASE"
+def mock_config(monkeypatch):
+    """Mock the exchange filters detect_regime reads."""
+    monkeypatch.setattr(main, "MIN_QTY", 0.0001)
+    monkeypatch.setattr(main, "MIN_NOTIONAL", 5.0)
+    monkeypatch.setattr(main, "LOT_SIZE", 0.0001)
+
+
+HOLD_BASE = ((1.0, 0.0), "BASE")  # holding ETH
+HOLD_QUOTE = ((0.0, 3000.0), "QUOTE")  # holding FDUSD
+
+
+@pytest.mark.parametrize(
+    "steps",
+    [
+        pytest.param([HOLD_BASE, HOLD_QUOTE], id="base_to_quote"),
+        pytest.param([HOLD_QUOTE, HOLD_BASE], id="quote_to_base"),
+        pytest.param([HOLD_BASE, HOLD_QUOTE, HOLD_BASE], id="full_cycle"),
+    ],
+)
+def test_regime_transition(mock_config, steps):
+    """Test regime follows inventory through BASE/QUOTE transitions."""
+    for (base_total, quote_total), expected in steps:
+        assert (
+            detect_regime(base_total, quote_total, bid=3000.0, ask=3001.0) == expected
+        )
 
 
 def test_state_reset_for_regime_flip():
@@ -84,6 +57,25 @@ def test_state_reset_for_regime_flip():
     assert state.hard_stop_armed is False
 
 
+@pytest.mark.parametrize("value", [0.01, 1.0, 3000.0, 1e6])
+@pytest.mark.parametrize(
+    ("maker_armed", "hard_armed"), [(False, False), (True, False), (True, True)]
+)
+def test_reset_for_regime_flip_invariants(value, maker_armed, hard_armed):
+    """Test reset leaves anchor == high == value and both exits disarmed."""
+    state = TrailingState()
+    state.reset_for_regime_flip(value / 2)
+    state.high_value = value * 2
+    state.maker_exit_armed = maker_armed
+    state.hard_stop_armed = hard_armed
+
+    state.reset_for_regime_flip(value)
+
+    assert state.anchor_value == state.high_value == value
+    assert state.maker_exit_armed is False
+    assert state.hard_stop_armed is False
+
+
 def test_donchian_gate_activation():
     """Test Donchian gate activation and deactivation."""
     state = TrailingState()
@@ -184,11 +176,18 @@ def test_manual_exit_trigger():
 def test_regime_none_with_insufficient_funds(mock_config):
     """Test that regime is None when funds are insufficient."""
     # Too little of both assets
-    balances = {"ETH": 0.00001, "FDUSD": 1.0}
-    regime = detect_regime(balances, bid=3000.0, ask=3001.0)
+    regime = detect_regime(0.00001, 1.0, bid=3000.0, ask=3001.0)
     assert regime is None
 
     # With debug=True, get reason
-    regime, reason = detect_regime(balances, bid=3000.0, ask=3001.0, debug=True)
+    regime, reason = detect_regime(0.00001, 1.0, bid=3000.0, ask=3001.0, debug=True)
     assert regime is None
     assert "below min" in reason.lower()
+
+
+def test_state_rejects_unknown_attributes():
+    """Test TrailingState uses slots, so a mistyped flag fails loudly."""
+    state = TrailingState()
+    with pytest.raises(AttributeError):
+        state.hard_stop_armd = True  # type: ignore[attr-defined]
+    assert state.bal is not TrailingState().bal  # fresh Balances per instance
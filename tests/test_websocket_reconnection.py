@@ -11,6 +11,14 @@ import pytest
 import websockets
 from websockets.frames import Close, CloseCode
 
+# Proper Close frame (a bare code/reason pair triggers deprecation warnings)
+_CLOSE = Close(CloseCode.NORMAL_CLOSURE, "test")
+
+
+def _connect_closed(*args, **kwargs):
+    """websockets.connect stand-in that always fails with a closed connection."""
+    raise websockets.exceptions.ConnectionClosedError(_CLOSE, None)
+
 
 @pytest.mark.asyncio
 async def test_bookticker_reconnection_attempts():
@@ -22,10 +30,7 @@ async def test_bookticker_reconnection_attempts():
 
     def mock_connect(*args, **kwargs):
         call_count[0] += 1
-        # Always fail to test retry mechanism
-        # Create proper Close frame to avoid deprecation warnings
-        rcvd = Close(CloseCode.NORMAL_CLOSURE, "test")
-        raise websockets.exceptions.ConnectionClosedError(rcvd, None)
+        _connect_closed()  # Always fail to test retry mechanism
 
     with patch(
         "trailingedge.websocket.market_stream.websockets.connect",
@@ -48,15 +53,9 @@ async def test_max_retries_exceeded():
 
     snapshot = {}
 
-    # Always fail
-    def mock_connect_always_fails(*args, **kwargs):
-        # Create proper Close frame to avoid deprecation warnings
-        rcvd = Close(CloseCode.NORMAL_CLOSURE, "test")
-        raise websockets.exceptions.ConnectionClosedError(rcvd, None)
-
     with patch(
         "trailingedge.websocket.market_stream.websockets.connect",
-        side_effect=mock_connect_always_fails,
+        side_effect=_connect_closed,  # Always fail to test all retries
     ):
         with patch(
             "trailingedge.websocket.market_stream.asyncio.sleep", new_callable=AsyncMock
@@ -77,15 +76,9 @@ async def test_exponential_backoff_delays():
     async def mock_sleep(delay):
         sleep_delays.append(delay)
 
-    # Always fail to test all retries
-    def mock_connect_always_fails(*args, **kwargs):
-        # Create proper Close frame to avoid deprecation warnings
-        rcvd = Close(CloseCode.NORMAL_CLOSURE, "test")
-        raise websockets.exceptions.ConnectionClosedError(rcvd, None)
-
     with patch(
         "trailingedge.websocket.market_stream.websockets.connect",
-        side_effect=mock_connect_always_fails,
+        side_effect=_connect_closed,  # Always fail to test all retries
     ):
         with patch(
             "trailingedge.websocket.market_stream.asyncio.sleep", side_effect=mock_sleep
@@ -113,9 +106,7 @@ async def test_connection_timeout_handling():
         if timeout_count[0] <= 1:
             raise asyncio.TimeoutError("Connection timed out")
         # After timeout, raise a different error to stop the loop
-        # Create proper Close frame to avoid deprecation warnings
-        rcvd = Close(CloseCode.NORMAL_CLOSURE, "test")
-        raise websockets.exceptions.ConnectionClosedError(rcvd, None)
+        _connect_closed()
 
     with patch(
         "trailingedge.websocket.market_stream.websockets.connect",
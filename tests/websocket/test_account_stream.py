@@ -0,0 +1,74 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import websockets
+
+from trailingedge.websocket.account_stream import (
+    Balances,
+    account_ws_receiver,
+    get_balance_from_snapshot,
+    parse_account_balance_event,
+)
+
+
+def test_get_balance_from_snapshot_flattens_pair():
+    """Test the snapshot is reduced to flat base/quote balance fields."""
+    snapshot = {}
+    message = (
+        '{"e": "outboundAccountPosition", "B": ['
+        '{"a": "ETH", "f": "1.5", "l": "0.5"}, {"a": "FDUSD", "f": "100", "l": "0"}]}'
+    )
+    assert parse_account_balance_event(message, snapshot)
+
+    bal = get_balance_from_snapshot(snapshot, "ETH", "FDUSD")
+
+    assert bal == Balances(1.5, 0.5, 2.0, 100.0, 0.0, 100.0)
+
+
+def test_get_balance_from_snapshot_missing_asset():
+    """Test assets absent from the snapshot read as zero."""
+    assert get_balance_from_snapshot({}, "ETH", "FDUSD") == Balances()
+
+
+def test_parse_account_balance_event_rejects_other_frames():
+    """Test non-balance and malformed frames leave the snapshot untouched."""
+    snapshot = {}
+    order_ack = b'{"id": "SELL", "status": 200, "result": {"orderId": 1}}'
+    malformed = '{"e": "outboundAccountPosition", "B": [{"a": "ETH"}]}'
+
+    assert not parse_account_balance_event(order_ack, snapshot)
+    assert not parse_account_balance_event(malformed, snapshot)
+    assert not parse_account_balance_event("outboundAccountPosition{", snapshot)
+    assert snapshot == {}
+
+
+def test_parse_account_balance_event_unwraps_event_envelope():
+    """Test WS API user-data frames wrapped in an 'event' key are parsed."""
+    snapshot = {}
+    message = (
+        b'{"subscriptionId": 0, "event": {"e": "outboundAccountPosition",'
+        b' "B": [{"a": "ETH", "f": "2", "l": "1"}]}}'
+    )
+
+    assert parse_account_balance_event(message, snapshot)
+    assert snapshot["ETH"] == {"free": 2.0, "locked": 1.0, "total": 3.0}
+
+
+async def test_account_ws_receiver_reads_raw_frames():
+    """Test the receiver parses undecoded frames and signals each update."""
+    snapshot = {}
+    updated = asyncio.Event()
+    ws = MagicMock()
+    ws.recv = AsyncMock(
+        side_effect=[
+            b'{"id": "BUY", "status": 200}',
+            b'{"e": "outboundAccountPosition", "B": [{"a": "ETH", "f": "1", "l": "0"}]}',
+            websockets.exceptions.ConnectionClosedOK(None, None),
+        ]
+    )
+
+    await account_ws_receiver(ws, snapshot, updated)
+
+    ws.recv.assert_awaited_with(decode=False)
+    assert snapshot["ETH"]["free"] == 1.0
+    assert updated.is_set()
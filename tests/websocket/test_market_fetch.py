@@ -1,7 +1,24 @@
+from unittest.mock import AsyncMock, patch
+
 import numpy as np
+import orjson
+import pandas as pd
+import pytest
 
-from trailingedge.indicators.atr import compute_atr
+from trailingedge.indicators import atr as atr_module
+from trailingedge.indicators.atr import (
+    compute_atr,
+    compute_atr_from_kline_dicts,
+    rolling_mean,
+    rolling_median,
+    rolling_percentile,
+)
 from trailingedge.indicators.donchian import compute_donchian_channels
+from trailingedge.websocket.market_fetch import (
+    fetch_kline_historical_custom_limit,
+    render_atr_chart,
+    render_donchian_chart,
+)
 
 
 def test_compute_atr_simple():
@@ -28,6 +45,51 @@ def test_compute_atr_simple():
     assert np.isclose(atr_series[-1], 10.0)
 
 
+def test_compute_atr_sma_series():
+    """Test SMA ATR alignment and values against a hand-computed window."""
+    # Closes 100, 102, 101, 104 with H/L = close +/- 1
+    # TR = [3, 2, 4] (gap to previous close dominates when it is larger)
+    closes = [100, 102, 101, 104]
+    klines = [[0, "0", str(c + 1), str(c - 1), str(c)] for c in closes]
+
+    atr_series = compute_atr(
+        klines, period=2, method="sma", row_format="row", return_series=True
+    )
+
+    assert atr_series[:2] == [None, None]
+    assert np.allclose(atr_series[2:], [2.5, 3.0])
+
+
+def test_compute_atr_from_kline_dicts():
+    """Test rolling-mean ATR from stream dicts matches per-window averages."""
+    closes = [100, 102, 101, 104]
+    kline_dicts = [{"h": str(c + 1), "l": str(c - 1), "c": str(c)} for c in closes]
+
+    # TR = [3, 2, 4]; one value per bar after the first 'period' bars
+    atr = compute_atr_from_kline_dicts(kline_dicts, period=2)
+
+    assert np.allclose(atr, [2.5, 3.0])
+    assert len(compute_atr_from_kline_dicts(kline_dicts[:2], period=2)) == 0
+
+
+def test_rolling_helpers_match_pandas():
+    """Test NumPy rolling mean/percentile/median against pandas min_periods=1."""
+    arr = np.array([3.0, np.nan, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+    rolling = pd.Series(arr).rolling(4, min_periods=1)
+    long_median = pd.Series(arr).rolling(20, min_periods=1).median()
+
+    assert np.allclose(rolling_mean(arr, 4), rolling.mean(), equal_nan=True)
+    assert np.allclose(rolling_median(arr, 4), rolling.median(), equal_nan=True)
+    assert np.allclose(rolling_median(arr, 20), long_median, equal_nan=True)
+    with patch.object(atr_module, "bn", None):  # pandas fallback path
+        assert np.allclose(rolling_median(arr, 4), rolling.median(), equal_nan=True)
+    assert np.allclose(
+        rolling_percentile(arr, 4),
+        rolling.apply(lambda x: np.percentile(x, 80)),
+        equal_nan=True,
+    )
+
+
 def test_compute_donchian_channels():
     """Test Donchian Channel calculation."""
     # Explicit data points for Close prices
@@ -57,3 +119,145 @@ def test_compute_donchian_channels():
     assert upper[-1] == 40.0
     assert lower[-1] == 10.0
     assert mid[-1] == 25.0
+
+
+def test_compute_donchian_channels_partial_window():
+    """Test Donchian warmup uses the partial window seen so far."""
+    klines = [{"c": str(c)} for c in [10, 30, 20, 5]]
+
+    upper, lower, _ = compute_donchian_channels(klines, window=3, shift=1)
+
+    # Shifted by 1: first value is NaN, then max/min over bars seen so far
+    assert np.isnan(upper[0])
+    assert np.isnan(lower[0])
+    assert list(upper[1:]) == [10.0, 30.0, 30.0]
+    assert list(lower[1:]) == [10.0, 10.0, 10.0]
+
+
+async def test_historical_fetch_pipelines_batches():
+    """Test all batches are sent up front and out-of-order replies are reordered."""
+    ws = AsyncMock()
+    ws.recv.side_effect = [
+        orjson.dumps({"id": "fetch_kline_1", "result": [["second"]]}),
+        orjson.dumps({"id": "other", "result": [["noise"]]}),
+        orjson.dumps({"id": "fetch_kline_0", "result": [["first"]]}),
+    ]
+
+    klines = await fetch_kline_historical_custom_limit(
+        ws, "ETHFDUSD", total_candles=1440
+    )
+
+    assert klines == [["first"], ["second"]]
+    sent = [orjson.loads(c.args[0]) for c in ws.send.call_args_list]
+    assert [p["params"]["limit"] for p in sent] == [1000, 440]
+    assert sent[1]["params"]["startTime"] - sent[0]["params"]["startTime"] == 60_000_000
+    # Every batch is capped just before the next one starts
+    assert sent[0]["params"]["endTime"] == sent[1]["params"]["startTime"] - 1
+
+
+async def test_historical_fetch_steps_by_interval():
+    """Test batch boundaries follow the requested interval, not a fixed 1m bar."""
+    ws = AsyncMock()
+    ws.recv.side_effect = [
+        orjson.dumps({"id": "fetch_kline_0", "result": []}),
+        orjson.dumps({"id": "fetch_kline_1", "result": []}),
+    ]
+
+    await fetch_kline_historical_custom_limit(
+        ws, "ETHFDUSD", interval="5m", total_candles=1200
+    )
+
+    first, second = (orjson.loads(c.args[0])["params"] for c in ws.send.call_args_list)
+    assert second["startTime"] - first["startTime"] == 1000 * 300_000
+    assert second["endTime"] - first["startTime"] == 1200 * 300_000
+    assert second["endTime"] % 300_000 == 0
+
+
+async def test_historical_fetch_aligns_to_timestamp_helper(caplog):
+    """Test the window ends on the last bar boundary of the shared ms clock."""
+    from trailingedge.websocket import market_fetch
+
+    ws = AsyncMock()
+    ws.recv.side_effect = [
+        orjson.dumps({"id": "stray", "result": []}),
+        orjson.dumps({"id": "fetch_kline_0", "result": []}),
+    ]
+
+    with (
+        patch.object(market_fetch, "get_server_timestamp", return_value=3_725_500),
+        caplog.at_level("DEBUG", logger="trailingedge"),
+    ):
+        await fetch_kline_historical_custom_limit(ws, "ETHFDUSD", total_candles=2)
+
+    params = orjson.loads(ws.send.call_args.args[0])["params"]
+    assert params["endTime"] == 3_720_000  # 62 full minutes
+    assert params["startTime"] == 3_600_000
+    assert "'stray'" in caplog.text
+
+
+async def test_historical_fetch_rejects_unsupported_interval():
+    """Test a calendar interval without a fixed bar length is refused up front."""
+    ws = AsyncMock()
+    with pytest.raises(ValueError, match="1M"):
+        await fetch_kline_historical_custom_limit(ws, "ETHFDUSD", interval="1M")
+    ws.send.assert_not_called()
+
+
+async def test_historical_fetch_raises_on_error_response():
+    """Test an error reply for a batch is raised instead of read as no klines."""
+    ws = AsyncMock()
+    ws.recv.side_effect = [
+        orjson.dumps({"id": "fetch_kline_0", "status": 400, "error": {"code": -1121}}),
+    ]
+
+    with pytest.raises(RuntimeError, match="fetch_kline_0"):
+        await fetch_kline_historical_custom_limit(ws, "BADSYMBOL", total_candles=10)
+
+
+def test_chart_renderers_run_offline():
+    """Test both chart renderers draw from canned klines without a websocket."""
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    klines = [
+        [i * 60_000, "100", str(101 + i % 3), str(99 - i % 2), str(100 + i % 5), "1"]
+        + [i * 60_000 + 59_999, "0", 1, "0", "0", "0"]
+        for i in range(120)
+    ]
+
+    atr_fig = render_atr_chart(klines, show=False)
+    donchian_fig = render_donchian_chart(klines, show=False)
+
+    assert len(atr_fig.axes) == 2  # ATR axis + twin close-price axis
+    assert len(donchian_fig.axes[0].get_lines()) == 4
+    plt.close("all")
+
+
+async def test_all_charts_share_one_session():
+    """Test both charts are drawn from a single connect + logon and one fetch."""
+    from trailingedge.websocket import market_fetch
+
+    klines = [["row"]] * market_fetch.TOTAL
+    connection = AsyncMock()
+    with (
+        patch.object(
+            market_fetch.websockets, "connect", return_value=connection
+        ) as connect,
+        patch("trailingedge.auth.manager.send_session_logon", AsyncMock()) as logon,
+        patch.object(
+            market_fetch,
+            "fetch_kline_historical_custom_limit",
+            AsyncMock(return_value=klines),
+        ) as fetch,
+        patch.object(market_fetch, "render_atr_chart") as atr_chart,
+        patch.object(market_fetch, "render_donchian_chart") as donchian_chart,
+    ):
+        await market_fetch.main_fetch_all_charts()
+
+    connect.assert_called_once()
+    assert connect.call_args.kwargs["compression"] is None
+    logon.assert_awaited_once()
+    fetch.assert_awaited_once()
+    atr_chart.assert_called_once_with(klines)
+    donchian_chart.assert_called_once_with(klines)
@@ -0,0 +1,66 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import websockets
+from websockets.frames import Close, CloseCode
+
+from trailingedge.websocket.market_stream import _iter_raw_messages, stream_kline_shared
+
+
+async def test_raw_messages_skip_text_decoding():
+    """Test stream payloads are read as bytes and iteration ends on a clean close."""
+    ws = AsyncMock()
+    ws.recv.side_effect = [
+        b'{"b": "1.0"}',
+        websockets.exceptions.ConnectionClosedOK(
+            Close(CloseCode.NORMAL_CLOSURE, "bye"), None
+        ),
+    ]
+
+    messages = [m async for m in _iter_raw_messages(ws)]
+
+    assert messages == [b'{"b": "1.0"}']
+    ws.recv.assert_called_with(decode=False)
+
+
+async def test_kline_stream_parses_prices_at_ingest():
+    """Test kline OHLCV is stored as floats and non-kline frames are ignored."""
+    kline_dict = {}
+    wake = asyncio.Event()
+    closed = websockets.exceptions.ConnectionClosedError(
+        Close(CloseCode.ABNORMAL_CLOSURE, "test"), None
+    )
+    ws = AsyncMock()
+    ws.recv.side_effect = [
+        b'{"k": {"t": 0, "T": 59999, "o": "1.5", "h": "2.5", "l": "1.0",'
+        b' "c": "2.0", "v": "10", "x": false}}',
+        b'{"result": null, "id": 1}',
+        closed,
+    ]
+    connection = AsyncMock()
+    connection.__aenter__.return_value = ws
+    connects = iter([connection])
+
+    def mock_connect(*args, **kwargs):
+        conn = next(connects, None)
+        if conn is None:
+            raise closed
+        return conn
+
+    with (
+        patch(
+            "trailingedge.websocket.market_stream.websockets.connect",
+            side_effect=mock_connect,
+        ),
+        patch(
+            "trailingedge.websocket.market_stream.asyncio.sleep", new_callable=AsyncMock
+        ),
+        pytest.raises(websockets.exceptions.ConnectionClosedError),
+    ):
+        await stream_kline_shared("ETHUSDT", "1m", kline_dict, wake=wake)
+
+    assert kline_dict["c"] == 2.0
+    assert kline_dict["v"] == 10.0
+    assert kline_dict["x"] is False
+    assert wake.is_set()  # Kline writes also wake the trading loop
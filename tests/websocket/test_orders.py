@@ -1,9 +1,13 @@
-import json
 from unittest.mock import AsyncMock, patch
 
+import orjson
 import pytest
 
-from trailingedge.websocket.orders import place_limit_order, place_market_order
+from trailingedge.websocket.orders import (
+    place_limit_order,
+    place_market_order,
+    place_oco_order,
+)
 
 
 @pytest.mark.asyncio
@@ -17,12 +21,13 @@ async def test_place_limit_order():
     ):
         await place_limit_order(mock_ws, "ETHFDUSD", "BUY", 3000.0, 0.1)
 
-        # Verify send was called
+        # Verify send was called with a text frame (Binance rejects binary)
         mock_ws.send.assert_called_once()
+        assert mock_ws.send.call_args.kwargs == {"text": True}
 
         # Verify payload content
         sent_json = mock_ws.send.call_args[0][0]
-        payload = json.loads(sent_json)
+        payload = orjson.loads(sent_json)
 
         assert payload["method"] == "order.place"
         assert payload["params"]["symbol"] == "ETHFDUSD"
@@ -45,9 +50,25 @@ async def test_place_market_order():
 
         mock_ws.send.assert_called_once()
         sent_json = mock_ws.send.call_args[0][0]
-        payload = json.loads(sent_json)
+        payload = orjson.loads(sent_json)
 
         assert payload["method"] == "order.place"
         assert payload["params"]["type"] == "MARKET"
         assert payload["params"]["side"] == "SELL"
         assert payload["params"]["quantity"] == "0.50000000"
+
+
+@pytest.mark.asyncio
+async def test_place_oco_order_ids_are_unique():
+    """Test consecutive OCO requests carry distinct correlation ids."""
+    mock_ws = AsyncMock()
+
+    with patch(
+        "trailingedge.websocket.orders.get_server_timestamp", return_value=1234567890
+    ):
+        await place_oco_order(mock_ws, "BTCUSDT", "SELL", 1.0, 110.0, 90.0)
+        await place_oco_order(mock_ws, "BTCUSDT", "SELL", 1.0, 110.0, 90.0)
+
+    first, second = (orjson.loads(c[0][0]) for c in mock_ws.send.call_args_list)
+    assert first["method"] == "orderList.place.oco"
+    assert first["id"] != second["id"]